@@ -0,0 +1,351 @@
+import gc
+import os
+import threading
+import weakref
+
+import numpy as np
+import pytest
+
+import zeviewer
+
+
+def test_uniform_histogram_matches_numpy():
+    rng = np.random.default_rng(0)
+    samples = [
+        rng.normal(100.0, 20.0, 200000).astype(np.float32),
+        rng.integers(0, 65535, 50000).astype(np.float32),
+        rng.random(1000),
+        np.full(10, 3.0, dtype=np.float32),
+    ]
+    for values in samples:
+        counts, edges = zeviewer._uniform_histogram(values, 256)
+        ref_counts, ref_edges = np.histogram(values, bins=256)
+        assert counts.shape == (256,)
+        assert counts.sum() == values.size
+        assert edges.dtype == ref_edges.dtype
+        np.testing.assert_array_equal(edges, ref_edges)
+        assert np.abs(counts - ref_counts).sum() <= 2
+
+
+def test_compute_histogram_ignores_non_finite():
+    arr = np.arange(100, dtype=np.float32).reshape(10, 10)
+    arr[0, 0] = np.nan
+    arr[1, 1] = np.inf
+    hist = zeviewer._compute_histogram(arr, 16)
+    assert hist["channels"] == 1
+    assert hist["counts"].sum() == 98
+    assert hist["edges"][0] == pytest.approx(1.0)
+    assert hist["edges"][-1] == pytest.approx(99.0)
+
+
+def test_stretch_to_rgb32_reuses_buffers():
+    rng = np.random.default_rng(1)
+    arr = rng.normal(100.0, 30.0, size=(40, 30, 3)).astype(np.float32)
+    arr[0, 0] = np.nan
+    expected = np.nan_to_num(np.clip((arr - 80.0) * (255.0 / (140.0 - 80.0)), 0.0, 255.0)).astype(np.uint8)
+
+    out = zeviewer._new_rgb32_buffer(40, 30)
+    scratch = np.empty(arr.shape, dtype=np.float32)
+    disp = zeviewer._stretch_to_rgb32(arr, 80.0, 140.0, out=out, scratch=scratch)
+    assert disp is out
+    assert disp.flags.c_contiguous
+    pixels = disp.view(np.uint32)[:, :, 0].astype(np.int64)
+    np.testing.assert_array_equal(pixels >> 24, 255)
+    for shift, channel in ((16, 0), (8, 1), (0, 2)):
+        np.testing.assert_array_equal((pixels >> shift) & 0xFF, expected[:, :, channel])
+
+    grey = zeviewer._stretch_to_rgb32(arr[:, :, 0], 80.0, 140.0, out=disp, scratch=scratch)
+    assert grey is disp
+    np.testing.assert_array_equal(grey.view(np.uint32)[:, :, 0], 0xFF000000 + expected[:, :, 0].astype(np.uint32) * 0x010101)
+
+    fresh = zeviewer._stretch_to_rgb32(arr[:20], 80.0, 140.0, out=out, scratch=scratch)
+    assert fresh is not out and fresh.shape == (20, 30, 4)
+
+
+def test_warmed_stretch_kernel_matches_numpy_path(monkeypatch):
+    pytest.importorskip("numba")
+    if not zeviewer._kernel_state["compiled"]:
+        # Only the GUI (main) thread may compile; worker calls are no-ops.
+        worker = threading.Thread(target=zeviewer._warm_stretch_kernel)
+        worker.start()
+        worker.join()
+        assert not zeviewer._kernel_state["compiled"]
+    zeviewer._warm_stretch_kernel()
+    assert zeviewer._kernel_state["compiled"]
+    rng = np.random.default_rng(2)
+    arr = rng.normal(100.0, 30.0, size=(40, 30, 3)).astype(np.float32)
+    arr[0, 0] = np.nan
+    for src in (arr, np.ascontiguousarray(arr[:, :, 1])):
+        fused = zeviewer._stretch_to_rgb32(src, 80.0, 140.0).copy()
+        monkeypatch.setitem(zeviewer._kernel_state, "compiled", False)
+        np.testing.assert_array_equal(fused, zeviewer._stretch_to_rgb32(src, 80.0, 140.0))
+        monkeypatch.undo()
+
+
+@pytest.fixture
+def qapp(monkeypatch):
+    QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+    if not zeviewer.QT_AVAILABLE:
+        pytest.skip("Qt not available")
+    monkeypatch.setenv("QT_QPA_PLATFORM", "offscreen")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def test_viewer_is_released_without_cyclic_gc(qapp):
+    gc.disable()
+    try:
+        viewer = zeviewer.ZeViewerWidget()
+        ref = weakref.ref(viewer)
+        del viewer
+        # Freed here by refcount, not later by a collection on some pool thread.
+        assert ref() is None
+    finally:
+        gc.enable()
+
+
+def test_current_dir_index_matches_other_spellings(qapp, tmp_path):
+    real = tmp_path / "real"
+    real.mkdir()
+    try:
+        (tmp_path / "link").symlink_to(real, target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks not available")
+    viewer = zeviewer.ZeViewerWidget()
+    viewer._set_dir_files([str(real / name) for name in ("a.png", "b.png", "c.png")])
+    viewer._last_path = str(real / "c.png")
+    assert viewer._current_dir_index(hint=0) == 2
+    viewer._last_path = str(tmp_path / "link" / "b.png")
+    assert viewer._current_dir_index() == 1
+    assert viewer._current_dir_index(hint=0) == 0
+    viewer._last_path = str(real / "missing.png")
+    assert viewer._current_dir_index() == -1
+
+
+def test_index_directory_finds_current(tmp_path):
+    names = ["b.fits", "A.png", "c.txt", "a.fit"]
+    for name in names:
+        (tmp_path / name).write_bytes(b"")
+    info = zeviewer._index_directory(str(tmp_path), str(tmp_path / "b.fits"))
+    files = [os.path.basename(p) for p in info["dir_files"]]
+    assert files == ["a.fit", "A.png", "b.fits"]
+    assert files[info["dir_index"]] == "b.fits"
+    missing = zeviewer._index_directory(str(tmp_path), str(tmp_path / "gone.fits"))
+    assert missing["dir_index"] == -1
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 200, 200001])
+def test_percentiles_by_partition_matches_numpy(n):
+    values = np.random.default_rng(n).normal(100.0, 30.0, n).astype(np.float32)
+    got = zeviewer._percentiles_by_partition(values, (0.5, 99.5))
+    np.testing.assert_array_equal(got, np.percentile(values, [0.5, 99.5]))
+
+
+def test_scratch_pool_reuses_arrays_per_shape():
+    pool = zeviewer._ScratchPool()
+    buf = pool.get((4, 5), np.float32)
+    assert pool.get((4, 5), np.float32) is buf
+    assert pool.get((4, 5), np.intp) is not buf
+    for n in range(pool.max_entries + 1):
+        pool.get((n + 1,), bool)
+    assert len(pool.arrays) <= pool.max_entries
+
+
+def test_compute_histogram_rgb_shares_edges():
+    rng = np.random.default_rng(2)
+    arr = rng.normal(100.0, 20.0, size=(60, 50, 3)).astype(np.float32)
+    arr[:, :, 2] += 40.0
+    arr[3, 4, 1] = np.nan
+    arr[5, 6, 0] = -np.inf
+    hist = zeviewer._compute_histogram(arr, 32)
+    assert hist["channels"] == 3
+    assert hist["counts"].shape == (3, 32)
+    finite = arr[np.isfinite(arr)]
+    assert hist["edges"][0] == pytest.approx(finite.min())
+    assert hist["edges"][-1] == pytest.approx(finite.max())
+    for c in range(3):
+        channel = arr[:, :, c]
+        ref, _ = np.histogram(channel[np.isfinite(channel)], bins=hist["edges"])
+        assert hist["counts"][c].sum() == ref.sum()
+        assert np.abs(hist["counts"][c] - ref).sum() <= 2
+
+    clean = np.nan_to_num(arr, nan=100.0, neginf=90.0)
+    fast = zeviewer._compute_histogram(clean, 32, finite=True)
+    masked = zeviewer._compute_histogram(clean, 32, finite=np.ones(clean.shape, dtype=bool))
+    np.testing.assert_array_equal(fast["counts"], masked["counts"])
+    np.testing.assert_array_equal(fast["edges"], masked["edges"])
+
+
+def test_build_hist_sample_strides_then_drops_non_finite():
+    arr = np.arange(1000, dtype=np.float32).reshape(20, 50)
+    arr[0, ::2] = np.nan
+    expected = arr.reshape(-1)[::4]
+    expected = expected[np.isfinite(expected)]
+    for finite in (None, np.isfinite(arr)):
+        sample = zeviewer._build_hist_sample(arr, 250, finite=finite)
+        assert sample.dtype == np.float32
+        np.testing.assert_array_equal(sample, expected)
+    full = zeviewer._build_hist_sample(arr[1:], 250, finite=True)
+    assert full.size <= 250 and np.isfinite(full).all()
+
+
+def test_block_mean_downsample_averages_whole_blocks():
+    rgb = np.arange(7 * 8 * 3, dtype=np.uint8).reshape(7, 8, 3)
+    out = zeviewer._block_mean_downsample(rgb, 3)
+    assert out.dtype == np.float32 and out.shape == (2, 2, 3)
+    expected = rgb[:6, :6].astype(np.float32).reshape(2, 3, 2, 3, 3).mean(axis=(1, 3))
+    np.testing.assert_allclose(out, expected)
+    grey = np.arange(5 * 4, dtype=np.float32).reshape(5, 4)
+    np.testing.assert_allclose(zeviewer._block_mean_downsample(grey, 2), [[2.5, 4.5], [10.5, 12.5]])
+
+
+def test_pil_preview_decodes_jpeg_at_reduced_scale(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    path = tmp_path / "frame.jpg"
+    Image.fromarray(np.full((48, 64, 3), 120, dtype=np.uint8)).save(path)
+    arr = zeviewer._load_pil_array(str(path), max_dim=16)
+    assert arr.dtype == np.uint8 and arr.shape == (12, 16, 3)
+    assert zeviewer._load_pil_array(str(path)).shape == (48, 64, 3)
+
+
+def test_fits_preview_decimates_while_reading(tmp_path):
+    fits = pytest.importorskip("astropy.io.fits")
+    data = np.arange(90 * 70, dtype=np.int16).reshape(90, 70)
+    path = tmp_path / "frame.fits"
+    fits.writeto(path, data)
+    arr, header = zeviewer._load_fits_preview_and_header(str(path), max_dim=40)
+    np.testing.assert_array_equal(arr, data[::3, ::3].astype(np.float32))
+    assert "NAXIS1" in header
+    full, _header = zeviewer._load_fits_preview_and_header(str(path))
+    assert full.shape == (90, 70)
+
+
+def test_scaled_fits_preview_reads_raw_values(tmp_path):
+    fits = pytest.importorskip("astropy.io.fits")
+    data = (np.arange(90 * 70, dtype=np.uint32) * 9).astype(np.uint16).reshape(90, 70)
+    path = tmp_path / "u16.fits"
+    fits.writeto(path, data)
+    assert fits.getheader(path)["BZERO"] == 32768
+    arr, header = zeviewer._load_fits_preview_and_header(str(path), max_dim=40)
+    np.testing.assert_array_equal(arr, data[::3, ::3].astype(np.float32))
+    assert "BZERO" in header
+
+    hdu = fits.PrimaryHDU(np.array([[1, -5], [7, 3]], dtype=np.int16))
+    hdu.header["BSCALE"] = 0.5
+    hdu.header["BZERO"] = 10.0
+    hdu.header["BLANK"] = -5
+    blank_path = tmp_path / "blank.fits"
+    hdu.writeto(blank_path)
+    arr, _header = zeviewer._load_fits_preview_and_header(str(blank_path))
+    np.testing.assert_array_equal(arr, np.array([[10.5, np.nan], [13.5, 11.5]], dtype=np.float32))
+
+
+def test_fitsio_preview_defers_blank_frames_to_astropy(tmp_path):
+    fits = pytest.importorskip("astropy.io.fits")
+    pytest.importorskip("fitsio")
+    hdu = fits.PrimaryHDU(np.array([[1, -5], [7, 3]], dtype=np.int16))
+    hdu.header["BLANK"] = -5
+    path = tmp_path / "blank.fits"
+    hdu.writeto(path)
+    assert zeviewer._load_fits_preview_fitsio(str(path)) is None
+    arr, _header = zeviewer._load_fits_preview_and_header(str(path))
+    np.testing.assert_array_equal(arr, np.array([[1, np.nan], [7, 3]], dtype=np.float32))
+
+
+class _StubFitsioHeader(dict):
+    def records(self):
+        return [{"card_string": f"{key:8}= {value!r}"} for key, value in self.items()]
+
+
+class _StubFitsioHDU:
+    def __init__(self, data, header):
+        self.data = data
+        self.header = _StubFitsioHeader(header)
+        self.reads = []
+
+    def has_data(self):
+        return True
+
+    def get_dims(self):
+        return list(self.data.shape)
+
+    def read_header(self):
+        return self.header
+
+    def read(self):
+        self.reads.append("full")
+        return self.data
+
+    def __getitem__(self, index):
+        self.reads.append(index)
+        return self.data[index]
+
+
+class _StubFitsio:
+    def __init__(self, hdu):
+        self.hdu = hdu
+
+    def FITS(self, _path):  # noqa: N802 - mirrors fitsio.FITS
+        stub = self
+
+        class _File:
+            def __enter__(self):
+                return [stub.hdu]
+
+            def __exit__(self, *_exc):
+                return False
+
+        return _File()
+
+
+def test_fitsio_preview_decimates_plain_frames_and_reads_bayer_in_full(monkeypatch):
+    data = np.arange(90 * 70, dtype=np.int16).reshape(90, 70)
+    hdu = _StubFitsioHDU(data, {"NAXIS1": 70, "NAXIS2": 90})
+    monkeypatch.setattr(zeviewer, "_fitsio_module", lambda: _StubFitsio(hdu))
+    arr, header = zeviewer._load_fits_preview_fitsio("frame.fits", max_dim=40)
+    assert hdu.reads == [(slice(None, None, 3), slice(None, None, 3))]
+    np.testing.assert_array_equal(arr, data[::3, ::3].astype(np.float32))
+    assert "NAXIS1" in header
+
+    hdu = _StubFitsioHDU(data, {"BAYERPAT": "RGGB"})
+    monkeypatch.setattr(zeviewer, "_fitsio_module", lambda: _StubFitsio(hdu))
+    arr, _header = zeviewer._load_fits_preview_fitsio("bayer.fits", max_dim=40)
+    assert hdu.reads == ["full"]
+    expected = zeviewer._finish_fits_preview(data.astype(np.float32), "RGGB")
+    assert arr.shape == expected.shape and arr.shape[2] == 3
+    np.testing.assert_array_equal(arr, expected)
+
+    hdu = _StubFitsioHDU(data, {"BLANK": -1})
+    monkeypatch.setattr(zeviewer, "_fitsio_module", lambda: _StubFitsio(hdu))
+    assert zeviewer._load_fits_preview_fitsio("blank.fits") is None
+    assert hdu.reads == []
+
+
+def test_private_array_rejects_file_mappings(tmp_path):
+    fits = pytest.importorskip("astropy.io.fits")
+    path = tmp_path / "f32.fits"
+    fits.writeto(path, np.ones((4, 4), dtype=np.float32))
+    with fits.open(path, memmap=True) as hdul:
+        assert not zeviewer._is_private_array(hdul[0].data)
+    mapped = np.memmap(tmp_path / "raw.bin", dtype=np.float32, mode="w+", shape=(4,))
+    assert not zeviewer._is_private_array(mapped[1:])
+    frozen = np.zeros(4, dtype=np.float32)
+    frozen.flags.writeable = False
+    assert not zeviewer._is_private_array(frozen)
+    assert zeviewer._is_private_array(np.zeros((4, 4), dtype=np.float32)[::2])
+
+
+def test_superseded_preview_load_emits_only_a_marker(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    if not hasattr(zeviewer, "PreviewLoadRunnable"):
+        pytest.skip("Qt not available")
+    path = tmp_path / "frame.png"
+    Image.fromarray(np.full((8, 8), 50, dtype=np.uint8)).save(path)
+    gate = zeviewer._TokenGate()
+    gate.current = 2
+    results = []
+    for token in (1, 2):
+        runnable = zeviewer.PreviewLoadRunnable(str(path), token, gate=gate)
+        runnable.signals.result.connect(results.append)
+        runnable.run()
+    assert results[0] == {"token": 1, "superseded": True}
+    assert results[1]["token"] == 2 and "linear_ds" in results[1]
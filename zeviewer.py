@@ -7,9 +7,17 @@ folder navigation and safe deletion.
 
 from __future__ import annotations
 
+import functools
+import importlib
+import importlib.util
 import math
+import mmap
 import os
+import stat
+import sys
+import threading
 import traceback
+from collections import OrderedDict
 from typing import Iterable, Optional
 
 # ---------------------------------------------------------------------------
@@ -41,22 +49,42 @@ def _tr(key: str, fallback: str) -> str:
 
 
 # ---------------------------------------------------------------------------
-# Optional dependencies (numpy / astropy / PIL)
+# Optional dependencies (numpy / astropy / fitsio / PIL / numba)
 # ---------------------------------------------------------------------------
 try:
     import numpy as np
 except Exception:  # pragma: no cover - allows headless import
     np = None
 
-try:
-    from astropy.io import fits
-except Exception:  # pragma: no cover
-    fits = None
 
-try:
-    from PIL import Image
-except Exception:  # pragma: no cover
-    Image = None
+@functools.lru_cache(maxsize=None)
+def _optional_module(name: str):
+    """Import an optional dependency on first use; None when it is unavailable.
+
+    The viewer is built with the main window, so importing astropy (and
+    numba, see _warm_stretch_kernel) up front would cost every start-up
+    several hundred ms, even when no preview is ever opened.
+    """
+
+    try:
+        return importlib.import_module(name)
+    except Exception:  # pragma: no cover - optional
+        return None
+
+
+def _fits_module():
+    return _optional_module("astropy.io.fits")
+
+
+def _fitsio_module():
+    """Optional fast CFITSIO reader."""
+
+    return _optional_module("fitsio")
+
+
+def _pil_image_module():
+    return _optional_module("PIL.Image")
+
 
 # ---------------------------------------------------------------------------
 # Qt imports (guarded to allow import without PySide6)
@@ -83,6 +111,7 @@ try:  # pragma: no cover - GUI runtime only
         QPen,
         QPolygonF,
         QFontDatabase,
+        QTransform,
     )
     from PySide6.QtWidgets import (
         QWidget,
@@ -96,6 +125,7 @@ try:  # pragma: no cover - GUI runtime only
         QDoubleSpinBox,
         QPushButton,
         QMessageBox,
+        QCheckBox,
         QSizePolicy,
         QFileDialog,
         QSplitter,
@@ -319,10 +349,37 @@ except Exception:  # pragma: no cover - allow import without Qt
         Key_Backspace = 0x01000003
         LeftButton = 1
 
+try:  # pragma: no cover - GUI runtime only
+    import shiboken6
+except Exception:  # pragma: no cover
+    shiboken6 = None
+
+try:  # pragma: no cover - GUI runtime only
+    from PySide6.QtGui import QOpenGLContext
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+except Exception:  # pragma: no cover - optional OpenGL viewport
+    QOpenGLContext = QOpenGLWidget = None
+
 # ---------------------------------------------------------------------------
 # Constants / helpers
 # ---------------------------------------------------------------------------
 SUPPORTED_EXTS = (".fit", ".fits", ".fts", ".png", ".jpg", ".jpeg")
+# Stretches on arrays with more elements than this run on a worker thread.
+ASYNC_STRETCH_MIN_SIZE = 1_000_000
+# While a level handle is dragged, previews larger than this (long edge) are
+# stretched from a decimated copy; releasing the handle renders full size.
+DRAG_PREVIEW_MAX_DIM = 800
+# Decoded previews kept for the neighbour being prefetched and the one just left.
+# Each entry is a whole worker payload (float32 preview plus sample and
+# histogram): ~36 MB for a 2000x1500 RGB preview, ~12 MB for a mono one.
+# Dropped on clear(), session resets and when the file is deleted.
+PREFETCH_CACHE_SIZE = 2
+# Display buffers are QImage.Format_RGB32 (0xffRRGGBB in native byte order), the
+# raster engine's fast path; these index the R, G, B bytes and the 0xff byte.
+if sys.byteorder == "little":
+    _RGB32_RGB, _RGB32_X = slice(2, None, -1), 3
+else:  # pragma: no cover - big-endian hosts
+    _RGB32_RGB, _RGB32_X = slice(1, 4), 0
 
 
 class _DummyQtSignal:
@@ -335,19 +392,48 @@ class _DummyQtSignal:
         return None
 
 
+@functools.lru_cache(maxsize=8192)
+def _norm_path(path: str) -> str:
+    """normcase(realpath(path)), memoised: scans and deletes revisit the same paths."""
+
+    return os.path.normcase(os.path.realpath(path))
+
+
 def _is_within_dir(path: str, dir_path: str) -> bool:
     """Return True if path is inside dir_path (case-insensitive on Windows)."""
 
     if not path or not dir_path:
         return False
-    p = os.path.normcase(os.path.realpath(path))
-    d = os.path.normcase(os.path.realpath(dir_path))
+    p = _norm_path(path)
+    d = _norm_path(dir_path)
     try:
         return os.path.commonpath([p, d]) == d
     except ValueError:
         return False
 
 
+def _debug_traceback() -> None:
+    """Print the current exception when ZE_VIEWER_DEBUG is set (loaders fail quietly otherwise)."""
+
+    if os.environ.get("ZE_VIEWER_DEBUG", "").strip() not in ("", "0", "false", "False"):
+        traceback.print_exc()
+
+
+class _TokenGate:
+    """Latest request token, shared between a viewer and its loader workers.
+
+    Workers compare their own token against ``current`` between expensive
+    steps and give up once a newer request superseded them. A plain int
+    attribute is enough: rebinding it is atomic and a stale read only
+    costs one more step.
+    """
+
+    __slots__ = ("current",)
+
+    def __init__(self):
+        self.current = 0
+
+
 # If Qt or numpy is not available, expose no-op classes to keep imports alive.
 if not QT_AVAILABLE or np is None:
     class ZeImageView(QGraphicsView):
@@ -437,6 +523,9 @@ if not QT_AVAILABLE or np is None:
         def apply_stretch(self, *_a, **_k):
             return None
 
+        def apply_stretch_preview(self, *_a, **_k):
+            return None
+
         def go_prev(self):
             return None
 
@@ -455,11 +544,13 @@ else:
     # Worker runnable
     # -----------------------------------------------------------------------
     class PreviewLoadSignals(QObject):
-        result = Signal(dict)
+        # object, not dict: a dict signal converts the payload to a QVariantMap
+        # and back on every emit; object hands the same dict across as is.
+        result = Signal(object)
 
 
     class PreviewLoadRunnable(QRunnable):
-        """Worker that loads and downsamples an image + optional dir index."""
+        """Worker that loads and downsamples an image (directory scans run in DirIndexRunnable)."""
 
         def __init__(
             self,
@@ -468,27 +559,38 @@ else:
             max_dim: int = 2000,
             sample_max: int = 200000,
             bins: int = 256,
-            index_dir: bool = False,
-            dir_path: Optional[str] = None,
+            gate: Optional[_TokenGate] = None,
         ):
             super().__init__()
             self.path = path
             self.token = token
+            self.gate = gate
             self.max_dim = max_dim
             self.sample_max = sample_max
             self.bins = bins
-            self.index_dir = index_dir
-            self.dir_path = dir_path
             self.signals = PreviewLoadSignals()
             try:
                 self.setAutoDelete(True)
             except Exception:
                 pass
 
+        def _superseded(self) -> bool:
+            gate = self.gate
+            return gate is not None and gate.current != self.token
+
+        def _emit_superseded(self):
+            # Still emit once, so holders that release runnables on a signal
+            # (analyse_gui_qt's keepalive) see it finish; the viewer drops it by token.
+            self.signals.result.emit({"token": self.token, "superseded": True})
+
         def run(self):
+            if self._superseded():
+                return self._emit_superseded()
             payload = {"token": self.token, "path": self.path}
             try:
                 linear, header_text = self._load_image(self.path)
+                if self._superseded():
+                    return self._emit_superseded()
                 if linear is None:
                     payload["error"] = "no_preview"
                     self.signals.result.emit(payload)
@@ -500,19 +602,35 @@ else:
                     wb = _compute_gray_world_gains_rgb(linear, sample_max=self.sample_max)
                     if wb is not None:
                         gains, _medians = wb
-                        preview_arr = np.ascontiguousarray(linear * np.asarray(gains, dtype=np.float32))
+                        # Scale whole rows by the gains tiled to row length:
+                        # broadcasting the 3-vector runs NumPy's inner loop
+                        # over 3 elements at a time, about 10x slower.
+                        h, w = linear.shape[:2]
+                        row_gains = np.tile(np.asarray(gains, dtype=np.float32), w)
+                        rows = np.ascontiguousarray(linear).reshape(h, w * 3)
+                        # linear is owned by this worker (fresh from _load_image); scale it in place.
+                        if linear.flags.writeable and linear.flags.c_contiguous:
+                            np.multiply(rows, row_gains, out=rows)
+                            preview_arr = linear
+                        else:
+                            preview_arr = np.multiply(rows, row_gains).reshape(linear.shape)
                         payload["wb_gains"] = gains
+                if self._superseded():
+                    return self._emit_superseded()
 
                 payload["header_text"] = header_text
                 payload["linear_ds"] = preview_arr
-                payload["hist_sample"] = _build_hist_sample(preview_arr, self.sample_max)
-                payload["stats"] = _compute_stats(payload["hist_sample"])
-                payload["hist"] = _compute_histogram(preview_arr, self.bins)
-                auto = _compute_auto_levels(payload["hist_sample"])
+                # One isfinite pass shared by the sample and the histogram; the
+                # sample itself is finite by construction.
+                mask = np.isfinite(preview_arr, out=_scratch_pool.get(preview_arr.shape, bool))
+                finite = True if mask.all() else mask
+                payload["hist_sample"] = _build_hist_sample(preview_arr, self.sample_max, finite=finite)
+                payload["stats"] = _compute_stats(payload["hist_sample"], finite=True)
+                if self._superseded():
+                    return self._emit_superseded()
+                payload["hist"] = _compute_histogram(preview_arr, self.bins, finite=finite)
+                auto = _compute_auto_levels(payload["hist_sample"], finite=True)
                 payload["auto_lo"], payload["auto_hi"] = auto
-
-                if self.index_dir:
-                    payload.update(_index_directory(self.dir_path or os.path.dirname(self.path), self.path))
             except Exception as exc:  # pragma: no cover - defensive
                 payload["error"] = f"{exc}"
                 payload["traceback"] = traceback.format_exc()
@@ -526,20 +644,111 @@ else:
             arr = None
             header_text = None
             if lower.endswith((".fit", ".fits", ".fts")):
-                arr, header_text = _load_fits_preview_and_header(path)
+                arr, header_text = _load_fits_preview_and_header(path, max_dim=self.max_dim)
             elif lower.endswith((".png", ".jpg", ".jpeg")):
-                arr = _load_pil_array(path)
+                arr = _load_pil_array(path, max_dim=self.max_dim)
             if arr is None or np is None:
                 return None, None
-            arr = np.ascontiguousarray(arr, dtype=np.float32)
             h, w = arr.shape[:2]
             if self.max_dim and max(h, w) > self.max_dim:
                 step = int(math.ceil(max(h, w) / float(self.max_dim)))
-                arr = arr[::step, ::step].copy()
-            return arr, header_text
+                arr = _block_mean_downsample(arr, step)
+            return np.ascontiguousarray(arr, dtype=np.float32), header_text
+
+    def _qimage_from_u8(disp) -> QImage:
+        """Wrap a contiguous uint8 (H,W), (H,W,3) or RGB32 (H,W,4) buffer into a QImage without copying.
+
+        The QImage aliases ``disp``; the array is pinned on the image and callers
+        keep it on the viewer while the image (or a pixmap made from it) is shown.
+        """
+
+        # Callers pass the preallocated stretch buffers; a strided view here would be
+        # a regression (QImage needs packed pixels), so check instead of copying.
+        assert disp.dtype == np.uint8 and disp.flags.c_contiguous, "display buffer must be C-contiguous uint8"
+        if disp.ndim == 2:
+            fmt = QImage.Format_Grayscale8
+        elif disp.shape[2] == 4:
+            fmt = QImage.Format_RGB32
+        else:
+            fmt = QImage.Format_RGB888
+        qimg = QImage(disp.data, disp.shape[1], disp.shape[0], disp.strides[0], fmt)
+        qimg._numpy_ref = disp
+        return qimg
+
+    def _pixmap_from_qimage(qimg: QImage) -> QPixmap:
+        """Convert without copying where the backend allows it (raster: shares the bits).
+
+        The pixmap may keep pointing at the QImage's buffer, so the backing array
+        must stay alive and untouched while the pixmap is displayed.
+        """
+
+        try:
+            return QPixmap.fromImageInPlace(qimg, Qt.NoFormatConversion)
+        except Exception:
+            return QPixmap.fromImage(qimg)
+
+    class PreviewStretchSignals(QObject):
+        result = Signal(object)
+
+
+    class PreviewStretchRunnable(QRunnable):
+        """Worker that stretches the linear preview into a display QImage."""
+
+        def __init__(self, arr, lo: float, hi: float, token: int, out=None, scratch=None):
+            super().__init__()
+            self.arr = arr
+            self.lo = lo
+            self.hi = hi
+            self.token = token
+            self.out = out
+            self.scratch = scratch
+            self.signals = PreviewStretchSignals()
+            try:
+                self.setAutoDelete(True)
+            except Exception:
+                pass
+
+        def run(self):
+            payload = {"token": self.token, "lo": self.lo, "hi": self.hi}
+            try:
+                disp = _stretch_to_rgb32(self.arr, self.lo, self.hi, out=self.out, scratch=self.scratch)
+                payload["display_u8"] = disp
+                payload["image"] = _qimage_from_u8(disp)
+            except Exception as exc:  # pragma: no cover - defensive
+                payload["error"] = f"{exc}"
+                payload["traceback"] = traceback.format_exc()
+            self.signals.result.emit(payload)
+
+    class DirIndexSignals(QObject):
+        result = Signal(object)
+
+
+    class DirIndexRunnable(QRunnable):
+        """Worker that lists a directory so the preview never waits on the scan."""
+
+        def __init__(self, dir_path: str, current_path: str, token: int):
+            super().__init__()
+            self.dir_path = dir_path
+            self.current_path = current_path
+            self.token = token
+            self.signals = DirIndexSignals()
+            try:
+                self.setAutoDelete(True)
+            except Exception:
+                pass
+
+        def run(self):
+            payload = {"token": self.token, "current_path": self.current_path}
+            try:
+                payload.update(_index_directory(self.dir_path, self.current_path))
+            except Exception as exc:  # pragma: no cover - defensive
+                payload["error"] = f"{exc}"
+                payload["traceback"] = traceback.format_exc()
+            self.signals.result.emit(payload)
+
 
     class PickFirstFileSignals(QObject):
-        picked = Signal(dict)
+        picked = Signal(object)
 
 
     class PickFirstFileRunnable(QRunnable):
@@ -565,7 +774,8 @@ else:
             self.signals.picked.emit(payload)
 
         def _pick_first_supported(self) -> Optional[str]:
-            if not self.dir_path or not os.path.isdir(self.dir_path):
+            # No isdir pre-check: scandir fails the same way on a missing directory.
+            if not self.dir_path:
                 return None
             first_path = None
             first_key = None
@@ -600,14 +810,32 @@ else:
             self.setDragMode(QGraphicsView.ScrollHandDrag)
             self.setFocusPolicy(Qt.StrongFocus)
             self._has_pixmap = False
+            # Opt-in GPU viewport (ZE_VIEWER_OPENGL=1). The single pixmap item
+            # already repaints as one rect with the default update mode, which
+            # also lets pans blit; GL viewports need full updates instead.
+            if QOpenGLWidget is not None and os.environ.get("ZE_VIEWER_OPENGL", "").strip() not in ("", "0", "false", "False"):
+                try:
+                    # Platforms without GL only warn and leave the viewport blank.
+                    if QOpenGLContext().create():
+                        self.setViewport(QOpenGLWidget())
+                        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+                except Exception:
+                    pass
 
         # Public helpers -------------------------------------------------
-        def set_pixmap(self, pix: Optional[QPixmap]):
+        def set_pixmap(self, pix: Optional[QPixmap], size: Optional[tuple[int, int]] = None):
+            """Show ``pix``; ``size`` (w, h) stretches a reduced draft over that scene rect."""
+
             if pix is None:
                 self._pix_item.setPixmap(QPixmap())
+                self._pix_item.setTransform(QTransform())
                 self._has_pixmap = False
                 return
             self._pix_item.setPixmap(pix)
+            transform = QTransform()
+            if size is not None and pix.width() and pix.height():
+                transform = QTransform.fromScale(size[0] / pix.width(), size[1] / pix.height())
+            self._pix_item.setTransform(transform)
             self._has_pixmap = True
             self.fit_in_view()
 
@@ -615,7 +843,7 @@ else:
             if not self._has_pixmap:
                 return
             try:
-                rect = self._pix_item.boundingRect()
+                rect = self._pix_item.sceneBoundingRect()
                 if rect.isNull():
                     return
                 self.fitInView(rect, Qt.KeepAspectRatio)
@@ -709,6 +937,52 @@ else:
     # -----------------------------------------------------------------------
     # Histogram widget (full width with draggable handles)
     # -----------------------------------------------------------------------
+    def _polygon_from_xy(xs, ys) -> QPolygonF:
+        """Build a QPolygonF from coordinate arrays without per-point QPointF objects."""
+
+        n = int(len(xs))
+        if shiboken6 is not None and n:
+            try:
+                poly = QPolygonF()
+                poly.resize(n)
+                buf = shiboken6.VoidPtr(poly.data(), 16 * n, True)
+                coords = np.frombuffer(buf, dtype=np.float64).reshape(n, 2)
+                coords[:, 0] = xs
+                coords[:, 1] = ys
+                return poly
+            except Exception:
+                pass
+        return QPolygonF([QPointF(float(x), float(y)) for x, y in zip(xs, ys)])
+
+    def _column_runs(xs):
+        """Return start/end indices of runs of equal pixel X, or None if not worth compressing."""
+
+        n = int(len(xs))
+        if n < 8:
+            return None
+        starts = np.flatnonzero(np.diff(xs)) + 1
+        starts = np.concatenate(([0], starts))
+        if 4 * starts.size >= n:
+            return None
+        ends = np.concatenate((starts[1:], [n]))
+        return starts, ends
+
+    def _compress_polyline(xs, ys, runs):
+        """Collapse bins sharing a pixel column to first/min/max/last vertices.
+
+        The vertical extent and the connecting segments are unchanged, so the
+        rasterised polyline is identical while using at most 4 points per column.
+        """
+
+        starts, ends = runs
+        out_x = np.repeat(xs[starts], 4)
+        out_y = np.empty(out_x.size, dtype=np.float64)
+        out_y[0::4] = ys[starts]
+        out_y[1::4] = np.minimum.reduceat(ys, starts)
+        out_y[2::4] = np.maximum.reduceat(ys, starts)
+        out_y[3::4] = ys[ends - 1]
+        return out_x, out_y
+
     class ZeHistogramWidget(QWidget):
         sig_levels_changing = Signal(float, float)
         sig_levels_changed = Signal(float, float)
@@ -722,7 +996,24 @@ else:
             self._zoom_view_lo: Optional[float] = None
             self._zoom_view_hi: Optional[float] = None
             self._drag_handle: Optional[str] = None
-            self._grab_radius = 12
+            self._handle_pos_key = None
+            self._handle_pos: tuple[Optional[int], Optional[int]] = (None, None)
+            self._curve_hist = None
+            self._curve_key = None
+            self._curves = None
+            self._layer: Optional[QPixmap] = None
+            self._layer_curves = None
+            self._layer_dpr = None
+            self._series_pens = [
+                QPen(QColor(80, 180, 255), 1),
+                QPen(QColor(255, 120, 120), 1),
+                QPen(QColor(120, 220, 120), 1),
+            ]
+            # (idle, dragging) pens per handle
+            self._handle_pens = {
+                "lo": (QPen(QColor(255, 200, 0), 1), QPen(QColor(255, 200, 0), 2)),
+                "hi": (QPen(QColor(255, 160, 0), 1), QPen(QColor(255, 160, 0), 2)),
+            }
             self.setMinimumHeight(120)
             try:
                 self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Minimum)
@@ -733,6 +1024,10 @@ else:
         def set_histogram(self, hist, lo: Optional[float] = None, hi: Optional[float] = None):
             if hist is None or hist is not self._hist:
                 self.zoom_reset()
+                # Release the previous histogram's curves and layer now rather
+                # than on the next paint.
+                self._curve_hist = self._curve_key = self._curves = None
+                self._layer = self._layer_curves = None
             self._hist = hist
             if lo is not None:
                 self._lo = lo
@@ -814,7 +1109,9 @@ else:
             return lo_edge, hi_edge
 
         def _value_to_pos(self, value: Optional[float]) -> Optional[int]:
-            rng = self._value_range()
+            return self._range_to_pos(value, self._value_range())
+
+        def _range_to_pos(self, value: Optional[float], rng: Optional[tuple[float, float]]) -> Optional[int]:
             if rng is None or value is None:
                 return None
             lo, hi = rng
@@ -839,21 +1136,24 @@ else:
             val = lo + span * ratio
             return min(hi, max(lo, val))
 
+        def _handle_positions(self) -> tuple[Optional[int], Optional[int]]:
+            """Pixel x of the lo/hi handles, shared by paintEvent and _pick_handle."""
+
+            rng = self._value_range()
+            key = (self._lo, self._hi, self.width(), rng)
+            if key != self._handle_pos_key:
+                self._handle_pos_key = key
+                self._handle_pos = (self._range_to_pos(self._lo, rng), self._range_to_pos(self._hi, rng))
+            return self._handle_pos
+
         def _pick_handle(self, pos_x: float) -> Optional[str]:
-            lo_pos = self._value_to_pos(self._lo)
-            hi_pos = self._value_to_pos(self._hi)
-            positions = []
-            if lo_pos is not None:
-                positions.append(("lo", lo_pos))
-            if hi_pos is not None:
-                positions.append(("hi", hi_pos))
-            if not positions:
-                return None
-            distances = sorted(((abs(pos_x - px), name) for name, px in positions), key=lambda t: t[0])
-            closest_dist, handle = distances[0]
-            if closest_dist <= self._grab_radius or len(positions) == 1:
-                return handle
-            return handle
+            # Always the closest handle (lo wins ties), so a click anywhere moves a level.
+            lo_pos, hi_pos = self._handle_positions()
+            if lo_pos is None:
+                return None if hi_pos is None else "hi"
+            if hi_pos is None:
+                return "lo"
+            return "lo" if abs(pos_x - lo_pos) <= abs(pos_x - hi_pos) else "hi"
 
         def _update_handle_value(self, handle: str, pos_x: float, final: bool = False):
             value = self._pos_to_value(pos_x)
@@ -885,36 +1185,33 @@ else:
                 pass
 
         # Painting -----------------------------------------------------
-        def paintEvent(self, event):  # noqa: N802
-            painter = QPainter(self)
-            rect = self.rect()
-            painter.fillRect(rect, QColor(18, 18, 18))
-            hist = self._hist if isinstance(self._hist, dict) else None
-            if hist is None or np is None:
-                return
+        def _curve_polylines(self, hist, view_range, rect):
+            """(pen, QPolygonF) per channel for the current view, or None when nothing can be drawn.
+
+            Cached on the histogram, view range and widget size: dragging a
+            handle repaints with the same curves and only moves the handle lines.
+            """
+
+            key = (view_range, rect.width(), rect.height())
+            if hist is self._curve_hist and key == self._curve_key:
+                return self._curves
+            self._curve_hist, self._curve_key = hist, key
+            self._curves = None
             counts = hist.get("counts")
             edges = hist.get("edges")
             if counts is None or edges is None:
-                return
-            view_range = self._value_range()
-            if view_range is None:
-                return
+                return None
             view_lo, view_hi = view_range
             counts_arr = np.asarray(counts)
             if counts_arr.ndim == 1:
                 counts_arr = counts_arr[np.newaxis, :]
             if counts_arr.ndim != 2 or counts_arr.shape[1] == 0 or len(edges) < 2:
-                return
+                return None
             edges_arr = np.asarray(edges)
             span = float(edges_arr[-1] - edges_arr[0]) if edges_arr.size >= 2 else 0.0
             if span == 0.0:
-                return
+                return None
             max_count = float(np.max(counts_arr)) or 1.0
-            palette = [
-                QColor(80, 180, 255),
-                QColor(255, 120, 120),
-                QColor(120, 220, 120),
-            ]
             centers = (edges_arr[:-1] + edges_arr[1:]) / 2.0
             height = max(1, rect.height() - 4)
             base_y = rect.bottom() - 2
@@ -929,34 +1226,80 @@ else:
                 and view_hi == self._zoom_view_hi
             )
 
+            # Same mapping as _value_to_pos, evaluated once for every bin center.
+            visible = None
+            if zoom_active:
+                visible = (centers >= view_lo) & (centers <= view_hi)
+                centers = centers[visible]
+            width = max(1, rect.width() - 1)
+            ratio = np.clip((centers - view_lo) / (view_hi - view_lo), 0.0, 1.0)
+            xs = np.rint(ratio * width)
+            # More bins than pixels: several bins land on the same column.
+            runs = _column_runs(xs)
+
+            curves = []
             for idx, row in enumerate(counts_arr):
                 if row.size == 0:
                     continue
-                pts = []
-                for cx, count in zip(centers, row):
-                    if zoom_active and (cx < view_lo or cx > view_hi):
-                        continue
-                    pos_x = self._value_to_pos(float(cx))
-                    if pos_x is None:
-                        continue
-                    y = base_y - int(round(float(count) * scale))
-                    y = max(rect.top() + 1, min(base_y, y))
-                    pts.append(QPointF(pos_x, y))
-                if len(pts) >= 2:
-                    pen = QPen(palette[idx % len(palette)], 1)
+                if visible is not None:
+                    row = row[visible]
+                if row.size < 2:
+                    continue
+                ys = np.clip(base_y - np.rint(row * scale), rect.top() + 1, base_y)
+                px, py = (xs, ys) if runs is None else _compress_polyline(xs, ys, runs)
+                curves.append((self._series_pens[idx % len(self._series_pens)], _polygon_from_xy(px, py)))
+            self._curves = curves
+            return curves
+
+        def _curve_layer(self, rect) -> Optional[QPixmap]:
+            """Background plus curves rendered once per _curve_polylines result.
+
+            Repaints (handle drags in particular) blit this pixmap and only draw
+            the handle lines on top. None when there is no histogram to draw.
+            """
+
+            hist = self._hist if isinstance(self._hist, dict) else None
+            if hist is None or np is None:
+                return None
+            view_range = self._value_range()
+            if view_range is None:
+                return None
+            curves = self._curve_polylines(hist, view_range, rect)
+            if curves is None:
+                return None
+            dpr = self.devicePixelRatioF()
+            if curves is self._layer_curves and dpr == self._layer_dpr and self._layer is not None:
+                return self._layer
+            layer = QPixmap(max(1, round(rect.width() * dpr)), max(1, round(rect.height() * dpr)))
+            layer.setDevicePixelRatio(dpr)
+            layer.fill(QColor(18, 18, 18))
+            painter = QPainter(layer)
+            try:
+                for pen, poly in curves:
                     painter.setPen(pen)
-                    painter.drawPolyline(QPolygonF(pts))
+                    painter.drawPolyline(poly)
+            finally:
+                painter.end()
+            self._layer, self._layer_curves, self._layer_dpr = layer, curves, dpr
+            return layer
 
-            for handle, value, color in (
-                ("lo", self._lo, QColor(255, 200, 0)),
-                ("hi", self._hi, QColor(255, 160, 0)),
-            ):
-                pos = self._value_to_pos(value)
-                if pos is None:
-                    continue
-                pen = QPen(color, 2 if self._drag_handle == handle else 1)
-                painter.setPen(pen)
-                painter.drawLine(pos, rect.top(), pos, rect.bottom())
+        def paintEvent(self, event):  # noqa: N802
+            painter = QPainter(self)
+            rect = self.rect()
+            layer = self._curve_layer(rect)
+            if layer is None:
+                painter.fillRect(rect, QColor(18, 18, 18))
+                return
+            painter.drawPixmap(0, 0, layer)
+
+            lo_pos, hi_pos = self._handle_positions()
+            top, bottom = rect.top(), rect.bottom()
+            if lo_pos is not None:
+                painter.setPen(self._handle_pens["lo"][self._drag_handle == "lo"])
+                painter.drawLine(lo_pos, top, lo_pos, bottom)
+            if hi_pos is not None:
+                painter.setPen(self._handle_pens["hi"][self._drag_handle == "hi"])
+                painter.drawLine(hi_pos, top, hi_pos, bottom)
 
         # Mouse interaction -------------------------------------------
         def mousePressEvent(self, event):  # noqa: N802
@@ -1008,11 +1351,21 @@ else:
         def __init__(self, parent=None):
             super().__init__(parent)
             self._active_token = 0
+            self._token_gate = _TokenGate()
             self._last_path: Optional[str] = None
+            # (path, mtime_ns, size) of the requested and of the displayed file;
+            # re-opening an unchanged file keeps the current preview.
+            self._pending_key: Optional[tuple[str, int, int]] = None
+            self._loaded_key: Optional[tuple[str, int, int]] = None
             self._dir_path: Optional[str] = None
-            self._dir_files: list[str] = []
+            self._dir_files: tuple[str, ...] = ()
+            self._dir_index_map: dict[str, int] = {}
             self._dir_index: int = -1
-            self._dir_cache_key: Optional[tuple[str, float, int]] = None
+            self._dir_cache_key: Optional[tuple[object, float, int]] = None
+            # Directory scans run on their own pool; the pending dir suppresses
+            # duplicate scans while navigating before the first one lands.
+            self._index_token = 0
+            self._index_pending_dir: Optional[str] = None
             self._skip_delete_confirm_session = False
             self._session_active = False
             self._session_levels: Optional[tuple[float, float]] = None
@@ -1023,14 +1376,17 @@ else:
             self._open_source = "none"
             self._autoload_project_dir: Optional[str] = None
             self._autoload_token = 0
+            self._autoload_reason = "autoload_first"
             self._linear_ds = None
             self._display_u8 = None
             self._hist_sample = None
+            self._hist_sample_stats = None
             self._auto_lo: Optional[float] = None
             self._auto_hi: Optional[float] = None
             self._hist = None
             self._wb_gains = None
             self._last_open_dir: Optional[str] = None
+            self._header_text = ""
             self._pending_levels: Optional[tuple[float, float]] = None
             self._levels_timer = QTimer(self)
             try:
@@ -1044,6 +1400,38 @@ else:
                 self._thread_pool.setMaxThreadCount(1)
             except Exception:
                 pass
+            # Stretch worker: at most one job in flight, newer levels wait in _pending_stretch.
+            self._stretch_token = 0
+            self._stretch_in_flight = False
+            self._pending_stretch: Optional[tuple[float, float]] = None
+            # (uint8 display A, uint8 display B, float scratch) reused by every stretch
+            # of the current image; A/B alternate so the shown one is never overwritten.
+            self._stretch_buffers = None
+            # (source array, decimated copy, buffers) for stretches during a handle drag.
+            self._draft = None
+            self._stretch_pool = QThreadPool(self)
+            try:
+                self._stretch_pool.setMaxThreadCount(1)
+            except Exception:
+                pass
+            self._index_pool = QThreadPool(self)
+            try:
+                self._index_pool.setMaxThreadCount(1)
+            except Exception:
+                pass
+            # Neighbour prefetch: the next file in the browsing direction is decoded
+            # while the current one is on screen. Payloads are keyed like
+            # _loaded_key so a modified file is never served from the cache.
+            self._nav_step = 1
+            self._shown_payload: Optional[dict] = None
+            self._prefetch_cache: OrderedDict[tuple[str, int, int], dict] = OrderedDict()
+            self._prefetch_pending: dict[str, tuple[str, int, int]] = {}
+            self._prefetch_adopt_token: Optional[int] = None
+            self._prefetch_pool = QThreadPool(self)
+            try:
+                self._prefetch_pool.setMaxThreadCount(1)
+            except Exception:
+                pass
 
             self._build_ui()
             self.retranslate_ui()
@@ -1100,6 +1488,18 @@ else:
             self.action_clear.triggered.connect(self.clear)
             self.toolbar.addAction(self.action_clear)
 
+            # Open/Clear stay enabled; the rest follow _update_toolbar_state.
+            self._nav_actions = (self.action_prev, self.action_next)
+            self._file_actions = (
+                self.action_delete,
+                self.action_fit,
+                self.action_one_to_one,
+                self.action_zoom_in,
+                self.action_zoom_out,
+                self.action_reset,
+            )
+            self._last_toolbar_state: Optional[tuple[bool, bool]] = None
+
             layout.addWidget(self.toolbar)
 
             self.splitter = QSplitter(Qt.Horizontal)
@@ -1196,7 +1596,7 @@ else:
             self.hist_zoom_btn.clicked.connect(self._toggle_hist_zoom)
 
             self.stretch_apply = QPushButton("")
-            self.stretch_apply.clicked.connect(lambda: self.apply_stretch(self.stretch_min.value(), self.stretch_max.value()))
+            self.stretch_apply.clicked.connect(self._on_stretch_apply_clicked)
 
             stretch_row.addWidget(self.stretch_min_label)
             stretch_row.addWidget(self.stretch_min)
@@ -1236,23 +1636,28 @@ else:
 
         def _update_toolbar_state(self):
             has_file = bool(self._last_path)
-            has_nav = bool(self._dir_files) and len(self._dir_files) > 1 and self._dir_index >= 0
-            for act, enabled in (
-                (self.action_prev, has_nav),
-                (self.action_next, has_nav),
-                (self.action_delete, has_file),
-                (self.action_open, True),
-                (self.action_fit, has_file),
-                (self.action_one_to_one, has_file),
-                (self.action_zoom_in, has_file),
-                (self.action_zoom_out, has_file),
-                (self.action_reset, has_file),
-                (self.action_clear, True),
-            ):
-                try:
-                    act.setEnabled(bool(enabled))
-                except Exception:
-                    pass
+            has_nav = len(self._dir_files) > 1 and self._dir_index >= 0
+            state = (has_file, has_nav)
+            # QAction.setEnabled relayouts the toolbar; only touch it on a real change.
+            if state == self._last_toolbar_state:
+                return
+            self._last_toolbar_state = state
+            for acts, enabled in ((self._nav_actions, has_nav), (self._file_actions, has_file)):
+                for act in acts:
+                    try:
+                        act.setEnabled(enabled)
+                    except Exception:
+                        pass
+
+        def _set_header_text(self, text: str):
+            # setPlainText relayouts the whole document, even for identical text.
+            if text == self._header_text:
+                return
+            try:
+                self.header_view.setPlainText(text)
+                self._header_text = text
+            except Exception:
+                pass
 
         def _update_hist_zoom_button(self):
             try:
@@ -1311,6 +1716,9 @@ else:
             self._open_source = "none"
             self._autoload_project_dir = None
             self._pending_levels = None
+            # A new session re-derives levels/zoom, so the next open must reload.
+            self._loaded_key = None
+            self._drop_prefetch()
             try:
                 if self._levels_timer.isActive():
                     self._levels_timer.stop()
@@ -1408,6 +1816,12 @@ else:
                 return
             self._update_session_view_zoom("manual", scale)
 
+        def _on_stretch_apply_clicked(self, *_args):
+            # A bound slot rather than a lambda: a closure over self would keep the
+            # viewer alive until a cyclic GC pass, which may run on a pool thread
+            # whose own QThreadPool then waits on itself while being destroyed.
+            self.apply_stretch(self.stretch_min.value(), self.stretch_max.value())
+
         def _on_spin_levels_changed(self, *_args):
             if getattr(self, "_ui_sync_guard", 0):
                 return
@@ -1484,7 +1898,8 @@ else:
             self._pending_levels = None
             if pending is None:
                 return
-            self.apply_stretch(*pending)
+            # Still dragging: the release (_on_hist_levels_changed_final) renders full size.
+            self.apply_stretch_preview(*pending)
 
         # Public API ------------------------------------------------------
         def _dirs_match(self, a: Optional[str], b: Optional[str]) -> bool:
@@ -1509,31 +1924,39 @@ else:
             if not dir_path or not os.path.isdir(dir_path):
                 return False
             if not self.has_image():
-                return self.autoload_first_from_dir(dir_path, reset_reason="autoload_first")
+                return self._start_autoload(dir_path, "autoload_first")
             if self._open_source == "manual":
                 return False
             if self._open_source == "project":
                 if self._autoload_project_dir and self._dirs_match(dir_path, self._autoload_project_dir):
                     return False
-                return self.autoload_first_from_dir(dir_path, reset_reason="autoload_project_dir_changed")
-            return self.autoload_first_from_dir(dir_path, reset_reason="autoload_override")
+                return self._start_autoload(dir_path, "autoload_project_dir_changed")
+            return self._start_autoload(dir_path, "autoload_override")
 
         def autoload_first_from_dir(self, project_dir: str, reset_reason: str = "autoload_first") -> bool:
             if not project_dir or not os.path.isdir(project_dir):
                 return False
+            return self._start_autoload(project_dir, reset_reason)
+
+        def _start_autoload(self, project_dir: str, reset_reason: str) -> bool:
+            # project_dir is already known to be a directory.
             self._autoload_token += 1
             token = self._autoload_token
+            # Stale picks are dropped by token, so the latest reason is the one to use.
+            self._autoload_reason = reset_reason
             runnable = PickFirstFileRunnable(project_dir, token)
-            runnable.signals.picked.connect(lambda payload, reason=reset_reason: self._on_autoload_picked(payload, reason))
+            runnable.signals.picked.connect(self._on_autoload_picked)
             try:
                 self._thread_pool.start(runnable)
             except Exception:
                 runnable.run()
             return True
 
-        def _on_autoload_picked(self, payload: dict, reset_reason: str = "autoload_first"):
+        def _on_autoload_picked(self, payload: dict, reset_reason: Optional[str] = None):
             if payload.get("token") != self._autoload_token:
                 return
+            if reset_reason is None:
+                reset_reason = self._autoload_reason
             first_path = payload.get("path")
             if not first_path:
                 if not self.has_image():
@@ -1551,9 +1974,10 @@ else:
 
         def clear(self):
             self.reset_session_state("clear")
+            self._invalidate_stretch()
             self._linear_ds = None
-            self._display_u8 = None
             self._hist_sample = None
+            self._hist_sample_stats = None
             self._auto_lo = None
             self._auto_hi = None
             self._hist = None
@@ -1564,15 +1988,16 @@ else:
                 self.image_view.set_pixmap(None)
             except Exception:
                 pass
-            try:
-                self.header_view.setPlainText("")
-            except Exception:
-                pass
+            self._display_u8 = None
+            self._set_header_text("")
             try:
                 self.hist_widget.set_histogram(None, None, None)
                 self.stats_label.setText("")
             except Exception:
                 pass
+            # Resolved paths are memoised for the session; start the next one fresh.
+            _norm_path.cache_clear()
+            self._drop_prefetch()
             self._set_status("no_preview_selected", "No preview selected.")
             self._update_toolbar_state()
 
@@ -1595,26 +2020,60 @@ else:
             except Exception:
                 pass
             self._last_path = path
-            if not path or not os.path.isfile(path):
+            try:
+                st = os.stat(path) if path else None
+            except (OSError, ValueError, TypeError):
+                st = None
+            if st is None or not stat.S_ISREG(st.st_mode):
                 self._set_status("preview_file_missing", "File not found.")
                 self._update_toolbar_state()
                 return
 
-            self._set_status("preview_loading", "Loading...")
+            self._dir_index = self._dir_index_map.get(path, self._dir_index)
+            # Any in-flight load is superseded either way.
             self._active_token += 1
             token = self._active_token
-            dir_path = os.path.dirname(os.path.abspath(path))
+            self._token_gate.current = token
+            dir_path = os.path.dirname(path)
             self._last_open_dir = dir_path
             self._dir_path = dir_path
             need_index = self._should_index_dir(dir_path) if index_dir is None else bool(index_dir)
+            key = (path, st.st_mtime_ns, st.st_size)
+            self._pending_key = key
+            self._prefetch_adopt_token = None
+            if key == self._loaded_key and self._linear_ds is not None:
+                # Same unchanged file already on screen: nothing to decode.
+                self._set_status("", "")
+                self._update_toolbar_state()
+                if need_index:
+                    self._start_dir_index(dir_path, path)
+                return
+
+            cached = self._prefetch_cache.pop(key, None)
+            # Keep the image being left so stepping back does not decode it again.
+            shown = self._shown_payload
+            if shown is not None and self._loaded_key is not None and shown.get("linear_ds") is self._linear_ds:
+                self._remember_payload(self._loaded_key, shown)
+            if cached is not None:
+                cached["token"] = token
+                self._on_worker_result(cached)
+                if need_index:
+                    self._start_dir_index(dir_path, path)
+                return
+            self._set_status("preview_loading", "Loading...")
+            if self._prefetch_pending.get(path) == key:
+                # Already being decoded ahead: take that result instead of a second decode.
+                self._prefetch_adopt_token = token
+                if need_index:
+                    self._start_dir_index(dir_path, path)
+                return
             runnable = PreviewLoadRunnable(
                 path=path,
                 token=token,
                 max_dim=2000,
                 sample_max=200000,
                 bins=256,
-                index_dir=need_index,
-                dir_path=dir_path,
+                gate=self._token_gate,
             )
             runnable.signals.result.connect(self._on_worker_result)
             try:
@@ -1622,8 +2081,66 @@ else:
             except Exception:
                 # Fallback to synchronous execution if pool fails
                 runnable.run()
+            if need_index:
+                self._start_dir_index(dir_path, path)
+
+        def _remember_payload(self, key: tuple[str, int, int], payload: dict):
+            cache = self._prefetch_cache
+            cache[key] = payload
+            cache.move_to_end(key)
+            while len(cache) > PREFETCH_CACHE_SIZE:
+                cache.popitem(last=False)
+
+        def _drop_prefetch(self, path: Optional[str] = None):
+            """Forget prefetched payloads: all of them, or only those of ``path``.
+
+            Pending entries go too, so a decode still running is discarded
+            when it lands instead of being cached again.
+            """
+
+            if path is None:
+                self._prefetch_cache.clear()
+                self._prefetch_pending.clear()
+                self._shown_payload = None
+                self._prefetch_adopt_token = None
+                return
+            for key in [key for key in self._prefetch_cache if key[0] == path]:
+                del self._prefetch_cache[key]
+            self._prefetch_pending.pop(path, None)
+            self._shown_payload = None
+
+        def _schedule_prefetch(self):
+            files = self._dir_files
+            if len(files) < 2 or self._dir_index < 0 or self._linear_ds is None:
+                return
+            path = files[(self._dir_index + self._nav_step) % len(files)]
+            try:
+                st = os.stat(path)
+            except (OSError, ValueError, TypeError):
+                return
+            key = (path, st.st_mtime_ns, st.st_size)
+            if key == self._loaded_key or key in self._prefetch_cache or self._prefetch_pending.get(path) == key:
+                return
+            self._prefetch_pending[path] = key
+            runnable = PreviewLoadRunnable(path=path, token=0, max_dim=2000, sample_max=200000, bins=256)
+            runnable.signals.result.connect(self._on_prefetch_result)
+            try:
+                # Below user-initiated work; the loader pool never waits on it.
+                self._prefetch_pool.start(runnable, -1)
+            except Exception:
+                self._prefetch_pending.pop(path, None)
+
+        def _start_dir_index(self, dir_path: str, current_path: str):
+            self._index_token += 1
+            self._index_pending_dir = _norm_path(dir_path)
+            runnable = DirIndexRunnable(dir_path, current_path, self._index_token)
+            runnable.signals.result.connect(self._on_dir_index_result)
+            try:
+                self._index_pool.start(runnable)
+            except Exception:
+                runnable.run()
 
-        def apply_stretch(self, lo: Optional[float] = None, hi: Optional[float] = None):
+        def apply_stretch(self, lo: Optional[float] = None, hi: Optional[float] = None, background: bool = True):
             if self._linear_ds is None or np is None:
                 return
             arr = self._linear_ds
@@ -1637,35 +2154,116 @@ else:
                 return
 
             try:
-                norm = np.clip((arr - lo) / (hi - lo), 0.0, 1.0)
-                if norm.ndim == 2:
-                    disp = (norm * 255.0).astype(np.uint8)
-                    disp = np.ascontiguousarray(disp)
-                    qimg = QImage(
-                        disp.data, disp.shape[1], disp.shape[0], disp.strides[0], QImage.Format_Grayscale8
-                    ).copy()
+                if background and arr.size > ASYNC_STRETCH_MIN_SIZE:
+                    self._start_background_stretch(float(lo), float(hi))
                 else:
-                    disp = (norm * 255.0).astype(np.uint8)
-                    disp = np.ascontiguousarray(disp)
-                    qimg = QImage(
-                        disp.data,
-                        disp.shape[1],
-                        disp.shape[0],
-                        disp.strides[0],
-                        QImage.Format_RGB888,
-                    ).copy()
-                self._display_u8 = disp
-                self.image_view.set_pixmap(QPixmap.fromImage(qimg))
+                    out, scratch = self._get_stretch_buffers(arr)
+                    disp = _stretch_to_rgb32(arr, lo, hi, out=out, scratch=scratch)
+                    self.image_view.set_pixmap(_pixmap_from_qimage(_qimage_from_u8(disp)))
+                    self._display_u8 = disp
                 self._set_status("", "")
-                self._update_stats_label(_compute_stats(self._hist_sample))
+                self._update_stats_label(self._hist_sample_stats)
                 self._update_histogram_display(self._hist, lo, hi)
                 self._sync_spinboxes(lo, hi)
             except Exception:
                 self._set_status("preview_failed", "Failed to load preview.")
 
+        def apply_stretch_preview(self, lo: float, hi: float):
+            """Quick stretch of a decimated copy, shown over the full image rect."""
+
+            arr = self._linear_ds
+            if arr is None or np is None:
+                return
+            h, w = arr.shape[:2]
+            step = int(math.ceil(max(h, w) / float(DRAG_PREVIEW_MAX_DIM)))
+            if step < 2 or not (math.isfinite(lo) and math.isfinite(hi) and lo < hi):
+                self.apply_stretch(lo, hi)
+                return
+            draft = self._draft
+            if draft is None or draft[0] is not arr:
+                small = np.ascontiguousarray(arr[::step, ::step])
+                sh, sw = small.shape[:2]
+                bufs = (_new_rgb32_buffer(sh, sw), _new_rgb32_buffer(sh, sw), np.empty_like(small))
+                draft = self._draft = (arr, small, bufs)
+            _arr, small, bufs = draft
+            # Supersede any full-size stretch still in flight; it serialises with the
+            # next one, so its buffer is free again by the time that one starts.
+            self._stretch_token += 1
+            self._pending_stretch = None
+            out = bufs[1] if bufs[0] is self._display_u8 else bufs[0]
+            try:
+                disp = _stretch_to_rgb32(small, lo, hi, out=out, scratch=bufs[2])
+                self.image_view.set_pixmap(_pixmap_from_qimage(_qimage_from_u8(disp)), size=(w, h))
+                self._display_u8 = disp
+            except Exception:
+                self._set_status("preview_failed", "Failed to load preview.")
+
+        def _set_dir_files(self, files: Iterable[str]):
+            self._dir_files = tuple(files)
+            self._dir_index_map = {p: i for i, p in enumerate(self._dir_files)}
+
+        def _current_dir_index(self, hint: int = -1) -> int:
+            """Position of _last_path in _dir_files, or -1.
+
+            Exact spelling first; then ``hint`` (an index a worker resolved for
+            this same path); then a _norm_path scan, which also matches a path
+            opened through another case or a symlinked folder.
+            """
+
+            path = self._last_path
+            if not path:
+                return -1
+            idx = self._dir_index_map.get(path)
+            if idx is not None:
+                return idx
+            if 0 <= hint < len(self._dir_files):
+                return hint
+            norm = _norm_path(path)
+            for i, p in enumerate(self._dir_files):
+                if _norm_path(p) == norm:
+                    return i
+            return -1
+
+        def _start_background_stretch(self, lo: float, hi: float):
+            if self._stretch_in_flight:
+                self._pending_stretch = (lo, hi)
+                return
+            self._stretch_in_flight = True
+            out, scratch = self._get_stretch_buffers(self._linear_ds)
+            runnable = PreviewStretchRunnable(self._linear_ds, lo, hi, self._stretch_token, out=out, scratch=scratch)
+            runnable.signals.result.connect(self._on_stretch_result)
+            try:
+                self._stretch_pool.start(runnable)
+            except Exception:
+                runnable.run()
+
+        def _get_stretch_buffers(self, arr):
+            bufs = self._stretch_buffers
+            h, w = arr.shape[:2]
+            if bufs is None or bufs[0].shape != (h, w, 4) or bufs[2].shape != arr.shape:
+                bufs = (
+                    _new_rgb32_buffer(h, w),
+                    _new_rgb32_buffer(h, w),
+                    np.empty(arr.shape, dtype=np.result_type(arr.dtype, np.float32)),
+                )
+                self._stretch_buffers = bufs
+            # The on-screen pixmap shares _display_u8's memory: render into the other one.
+            out = bufs[1] if bufs[0] is self._display_u8 else bufs[0]
+            return out, bufs[2]
+
+        def _invalidate_stretch(self):
+            """Drop pending/in-flight stretches (the displayed image changed)."""
+
+            self._stretch_token += 1
+            self._pending_stretch = None
+            # A stale job may still be writing into the old buffers.
+            self._stretch_buffers = None
+            self._draft = None
+
         def go_prev(self):
             if not self._dir_files or self._dir_index < 0:
                 return
+            self._nav_step = -1
             new_idx = (self._dir_index - 1) % len(self._dir_files)
             new_path = self._dir_files[new_idx]
             self._dir_index = new_idx
@@ -1678,6 +2276,7 @@ else:
         def go_next(self):
             if not self._dir_files or self._dir_index < 0:
                 return
+            self._nav_step = 1
             new_idx = (self._dir_index + 1) % len(self._dir_files)
             new_path = self._dir_files[new_idx]
             self._dir_index = new_idx
@@ -1708,13 +2307,8 @@ else:
                     box.setButtonText(QMessageBox.No, _tr("preview_delete_no", "No"))
                 except Exception:
                     pass
-                try:
-                    from PySide6.QtWidgets import QCheckBox  # type: ignore
-                except Exception:
-                    QCheckBox = None  # type: ignore
-                if QCheckBox:
-                    cb = QCheckBox(_tr("preview_delete_checkbox", "Don't show this message again (this session)"))
-                    box.setCheckBox(cb)
+                cb = QCheckBox(_tr("preview_delete_checkbox", "Don't show this message again (this session)"))
+                box.setCheckBox(cb)
                 result = box.exec()
                 try:
                     cb_widget = box.checkBox()
@@ -1730,17 +2324,17 @@ else:
                 self.image_view.set_pixmap(None)
             except Exception:
                 pass
+            self._set_header_text("")
             try:
-                self.header_view.setPlainText("")
-            except Exception:
-                pass
-            try:
+                self._invalidate_stretch()
                 self._linear_ds = None
                 self._display_u8 = None
                 os.remove(path)
             except Exception:
                 self._set_status("preview_delete_failed", "Failed to delete.")
                 return
+            self._loaded_key = None
+            self._drop_prefetch(path)
 
             try:
                 self.sig_file_deleted.emit(path)
@@ -1748,8 +2342,15 @@ else:
                 pass
 
             # Update dir list and navigate
-            norm = os.path.normcase(os.path.realpath(path))
-            self._dir_files = [p for p in self._dir_files if os.path.normcase(os.path.realpath(p)) != norm]
+            # The index normally holds the exact path we loaded, so splice it
+            # out by position; only fall back to realpath comparison otherwise.
+            idx = self._dir_index_map.get(path)
+            if idx is not None:
+                remaining = self._dir_files[:idx] + self._dir_files[idx + 1:]
+            else:
+                norm = _norm_path(path)
+                remaining = [p for p in self._dir_files if _norm_path(p) != norm]
+            self._set_dir_files(remaining)
             if self._dir_files:
                 if self._dir_index >= len(self._dir_files):
                     self._dir_index = 0
@@ -1760,26 +2361,29 @@ else:
 
             try:
                 if self._dir_path and os.path.isdir(self._dir_path):
-                    self._dir_cache_key = _build_dir_cache_key(self._dir_path, self._dir_files)
+                    self._dir_cache_key = _build_dir_cache_key(self._dir_path, len(self._dir_files))
             except Exception:
                 pass
 
         def retranslate_ui(self):
             try:
-                self.action_prev.setText(_tr("preview_tb_prev", "Previous image"))
-                self.action_prev.setToolTip(_tr("preview_tb_prev", "Previous image"))
-                self.action_next.setText(_tr("preview_tb_next", "Next image"))
-                self.action_next.setToolTip(_tr("preview_tb_next", "Next image"))
-                self.action_delete.setText(_tr("preview_tb_delete", "Delete image"))
-                self.action_delete.setToolTip(_tr("preview_tb_delete", "Delete image"))
-                self.action_open.setText(_tr("preview_open", "Open file"))
-                self.action_open.setToolTip(_tr("preview_open", "Open file"))
-                self.action_fit.setText(_tr("preview_fit", "Fit"))
-                self.action_one_to_one.setText(_tr("preview_1_1", "1:1"))
-                self.action_zoom_in.setText(_tr("preview_zoom_in", "Zoom in"))
-                self.action_zoom_out.setText(_tr("preview_zoom_out", "Zoom out"))
-                self.action_reset.setText(_tr("preview_reset", "Reset"))
-                self.action_clear.setText(_tr("preview_clear", "Clear"))
+                # (action, key, fallback, also used as tooltip): one lookup per key.
+                for act, key, fallback, tooltip in (
+                    (self.action_prev, "preview_tb_prev", "Previous image", True),
+                    (self.action_next, "preview_tb_next", "Next image", True),
+                    (self.action_delete, "preview_tb_delete", "Delete image", True),
+                    (self.action_open, "preview_open", "Open file", True),
+                    (self.action_fit, "preview_fit", "Fit", False),
+                    (self.action_one_to_one, "preview_1_1", "1:1", False),
+                    (self.action_zoom_in, "preview_zoom_in", "Zoom in", False),
+                    (self.action_zoom_out, "preview_zoom_out", "Zoom out", False),
+                    (self.action_reset, "preview_reset", "Reset", False),
+                    (self.action_clear, "preview_clear", "Clear", False),
+                ):
+                    text = _tr(key, fallback)
+                    act.setText(text)
+                    if tooltip:
+                        act.setToolTip(text)
                 self.header_title.setText(_tr("preview_header_title", "Header"))
                 try:
                     self.header_view.setToolTip(_tr("preview_header_tip", "FITS header for the current image"))
@@ -1796,11 +2400,63 @@ else:
             self._update_toolbar_state()
 
         # Slots -----------------------------------------------------------
-        @Slot(dict)
+        @Slot(object)
+        def _on_stretch_result(self, payload: dict):
+            self._stretch_in_flight = False
+            if payload.get("token") == self._stretch_token and self._linear_ds is not None:
+                if payload.get("error"):
+                    self._set_status("preview_failed", "Failed to load preview.")
+                else:
+                    try:
+                        self.image_view.set_pixmap(_pixmap_from_qimage(payload["image"]))
+                        self._display_u8 = payload.get("display_u8")
+                    except Exception:
+                        self._set_status("preview_failed", "Failed to load preview.")
+            pending = self._pending_stretch
+            self._pending_stretch = None
+            if pending is not None and self._linear_ds is not None:
+                self._start_background_stretch(*pending)
+
+        @Slot(object)
+        def _on_dir_index_result(self, payload: dict):
+            if payload.get("token") != self._index_token:
+                return
+            self._index_pending_dir = None
+            dir_path = payload.get("dir_path")
+            if payload.get("error") or not dir_path:
+                return
+            # The user may have moved to another folder while the scan ran.
+            if not self._dir_path or _norm_path(self._dir_path) != _norm_path(dir_path):
+                return
+            self._set_dir_files(payload.get("dir_files") or ())
+            hint = payload.get("dir_index", -1) if payload.get("current_path") == self._last_path else -1
+            self._dir_index = self._current_dir_index(hint)
+            self._dir_cache_key = payload.get("dir_cache_key") or _build_dir_cache_key(
+                dir_path, len(self._dir_files)
+            )
+            self._update_toolbar_state()
+            self._schedule_prefetch()
+
+        @Slot(object)
+        def _on_prefetch_result(self, payload: dict):
+            key = self._prefetch_pending.pop(payload.get("path"), None)
+            if key is None:
+                return
+            if self._prefetch_adopt_token == self._active_token and key == self._pending_key:
+                # The user got there first and is waiting on this decode.
+                self._prefetch_adopt_token = None
+                payload["token"] = self._active_token
+                self._on_worker_result(payload)
+                return
+            if not payload.get("error") and payload.get("linear_ds") is not None:
+                self._remember_payload(key, payload)
+
+        @Slot(object)
         def _on_worker_result(self, payload: dict):
             if payload.get("token") != self._active_token:
                 return
             header_text = payload.get("header_text")
+            self._loaded_key = None
             if payload.get("error"):
                 if payload.get("error") == "no_preview":
                     self.reset_session_state("no_preview")
@@ -1808,10 +2464,8 @@ else:
                         self.image_view.set_pixmap(None)
                     except Exception:
                         pass
-                    try:
-                        self.header_view.setPlainText("")
-                    except Exception:
-                        pass
+                    self._set_header_text("")
+                    self._invalidate_stretch()
                     self._linear_ds = None
                     self._hist = None
                     self._pending_levels = None
@@ -1820,14 +2474,16 @@ else:
                     self._update_toolbar_state()
                     return
                 self._set_status("preview_failed", "Failed to load preview.")
-                try:
-                    self.header_view.setPlainText("")
-                except Exception:
-                    pass
+                self._set_header_text("")
                 return
 
+            self._invalidate_stretch()
             self._linear_ds = payload.get("linear_ds")
+            self._loaded_key = self._pending_key
+            self._shown_payload = payload
             self._hist_sample = payload.get("hist_sample")
+            # Stats only depend on the sample, not on the stretch levels.
+            self._hist_sample_stats = payload.get("stats")
             self._auto_lo = payload.get("auto_lo")
             self._auto_hi = payload.get("auto_hi")
             self._hist = payload.get("hist")
@@ -1837,24 +2493,12 @@ else:
             except Exception:
                 pass
             self._pending_levels = None
-            try:
-                self.header_view.setPlainText(header_text or "")
-            except Exception:
-                pass
+            self._set_header_text(header_text or "")
 
-            # Update directory cache if provided
-            if payload.get("dir_files") is not None:
-                self._dir_path = payload.get("dir_path")
-                self._dir_files = payload.get("dir_files") or []
-                self._dir_index = payload.get("dir_index", -1)
-                self._dir_cache_key = payload.get("dir_cache_key") or _build_dir_cache_key(
-                    self._dir_path, self._dir_files
-                )
-            else:
-                # best-effort dir info even when not indexed
-                if self._last_path:
-                    self._dir_path = os.path.dirname(os.path.abspath(self._last_path))
-                    self._dir_index = self._dir_files.index(self._last_path) if self._last_path in self._dir_files else -1
+            # Directory listings arrive separately (_on_dir_index_result).
+            if self._last_path:
+                self._dir_path = os.path.dirname(os.path.abspath(self._last_path))
+                self._dir_index = self._current_dir_index()
 
             def _valid_levels(lo, hi):
                 try:
@@ -1882,10 +2526,15 @@ else:
                 self._session_active = True
             self._update_histogram_display(self._hist, target_lo, target_hi)
             self._sync_spinboxes(target_lo, target_hi)
-            self.apply_stretch(target_lo, target_hi)
+            # Synchronous so the session zoom below applies to the new pixmap.
+            self.apply_stretch(target_lo, target_hi, background=False)
             self._apply_session_hist_zoom()
             self._apply_session_view_zoom()
             self._update_toolbar_state()
+            self._schedule_prefetch()
+            if _kernel_state["ready"] and not _kernel_state["compiled"]:
+                # Compile the display kernel once this preview has painted.
+                QTimer.singleShot(250, _warm_stretch_kernel)
 
         # Internal helpers -------------------------------------------------
         def _fit_view(self):
@@ -1959,13 +2608,15 @@ else:
             if not dir_path:
                 return False
             try:
-                stat = os.stat(dir_path)
-                dir_real = os.path.normcase(os.path.realpath(dir_path))
-                new_key = (dir_real, getattr(stat, "st_mtime", 0.0), None)
+                st = os.stat(dir_path)
+                dir_id = _dir_identity(dir_path, st)
+                new_key = (dir_id, getattr(st, "st_mtime", 0.0), None)
+                if self._index_pending_dir is not None and self._index_pending_dir == _norm_path(dir_path):
+                    return False
                 if self._dir_cache_key is None:
                     return True
                 cached_dir, cached_mtime, _ = self._dir_cache_key
-                if cached_dir != dir_real:
+                if cached_dir != dir_id:
                     return True
                 if abs(cached_mtime - new_key[1]) > 1e-6:
                     return True
@@ -2019,28 +2670,36 @@ def _debayer_preview_2x2(raw: np.ndarray, pattern: str):
             r = bottom_left
             g2 = bottom_right
 
-        g = 0.5 * (g1 + g2)
-        return np.stack([r, g, b], axis=-1).astype(np.float32, copy=False)
+        # Write straight into the interleaved output: no temporary green plane,
+        # no stack + astype round trip.
+        out = np.empty((h2 // 2, w2 // 2, 3), dtype=np.float32)
+        green = out[..., 1]
+        np.copyto(out[..., 0], r, casting="unsafe")
+        np.add(g1, g2, out=green, dtype=np.float32)
+        np.multiply(green, 0.5, out=green)
+        np.copyto(out[..., 2], b, casting="unsafe")
+        return out
     except Exception:
         return None
 
 
 def _pick_first_image_hdu(hdulist):
-    try:
-        primary = hdulist[0]
-        data0 = getattr(primary, "data", None)
-        if data0 is not None and np.asarray(data0).ndim >= 2:
-            return primary
-    except Exception:
-        pass
+    """First image HDU with at least two axes, judged from headers only.
+
+    Touching ``hdu.data`` here would read (and scale) every candidate in full.
+    """
+
+    def _is_2d_image(hdu) -> bool:
+        if not getattr(hdu, "is_image", False):
+            return False
+        hdr = hdu.header
+        naxis = int(hdr.get("NAXIS", 0))
+        return naxis >= 2 and all(int(hdr.get(f"NAXIS{i}", 0)) > 0 for i in range(1, naxis + 1))
 
     try:
         for hdu in hdulist:
             try:
-                data = getattr(hdu, "data", None)
-                if data is None:
-                    continue
-                if np.asarray(data).ndim >= 2:
+                if _is_2d_image(hdu):
                     return hdu
             except Exception:
                 continue
@@ -2049,8 +2708,168 @@ def _pick_first_image_hdu(hdulist):
     return None
 
 
-def _load_fits_preview_and_header(path: str):
-    if fits is None or np is None:
+def _block_mean_downsample(arr, step: int):
+    """Average ``step`` x ``step`` blocks of a (H,W) or (H,W,3) array into float32.
+
+    Trailing rows/columns that do not fill a block are dropped. Rows are summed
+    first so both passes add long runs, and the source dtype is converted on the
+    way instead of in a separate full-resolution pass.
+    """
+
+    h, w = arr.shape[:2]
+    bh, bw = h // step, w // step
+    if bh == 0 or bw == 0:
+        return arr[::step, ::step]
+    arr = arr[: bh * step, : bw * step]
+    rows = np.add(arr[0::step], arr[1::step], dtype=np.float32)
+    for i in range(2, step):
+        np.add(rows, arr[i::step], out=rows)
+    out = np.add(rows[:, 0::step], rows[:, 1::step])
+    for j in range(2, step):
+        np.add(out, rows[:, j::step], out=out)
+    out *= np.float32(1.0 / (step * step))
+    return out
+
+
+def _fits_preview_slices(shape, max_dim: int):
+    """Index that decimates the spatial axes of squeezed FITS data, or None.
+
+    Uses the same step as _load_image's downsample, but FITS frames keep
+    plain decimation: only the sampled rows are read, and the statistics
+    shown for the preview stay those of real pixel values.
+    """
+
+    if not max_dim:
+        return None
+    if len(shape) == 2:
+        spatial = (0, 1)
+    elif len(shape) == 3 and shape[0] == 3 and shape[1] != 3:
+        spatial = (1, 2)
+    elif len(shape) == 3 and shape[2] == 3:
+        spatial = (0, 1)
+    else:
+        return None
+    longest = max(shape[spatial[0]], shape[spatial[1]])
+    if longest <= max_dim:
+        return None
+    step = int(math.ceil(longest / float(max_dim)))
+    return tuple(slice(None, None, step) if axis in spatial else slice(None) for axis in range(len(shape)))
+
+
+def _load_fits_preview_fitsio(path: str, max_dim: int = 0):
+    """(array, header_text) read through CFITSIO, or None to fall back to astropy."""
+
+    fitsio = _fitsio_module()
+    try:
+        with fitsio.FITS(path) as f:
+            for hdu in f:
+                try:
+                    if not hdu.has_data() or len(hdu.get_dims()) < 2:
+                        continue
+                except Exception:
+                    continue
+                hdr = hdu.read_header()
+                if "BLANK" in hdr:
+                    # CFITSIO returns the (scaled) BLANK sentinel as data; the
+                    # astropy path turns those pixels into NaN.
+                    return None
+                # CFITSIO applies BZERO/BSCALE; plain 2-D frames are read
+                # already decimated (Bayer data needs every pixel).
+                dims = hdu.get_dims()
+                index = None if hdr.get("BAYERPAT") else _fits_preview_slices(dims, max_dim)
+                data = hdu[index] if index is not None and len(dims) == 2 else hdu.read()
+                arr = np.ascontiguousarray(np.squeeze(data), dtype=np.float32)
+                try:
+                    header_text = "\n".join(
+                        rec["card_string"] for rec in hdr.records() if rec.get("card_string")
+                    )
+                except Exception:
+                    header_text = str(hdr)
+                return _finish_fits_preview(arr, hdr.get("BAYERPAT")), header_text
+    except Exception:
+        _debug_traceback()
+    return None
+
+
+def _is_private_array(arr) -> bool:
+    """True when arr is writable memory of its own, not a view onto a file mapping.
+
+    Astropy's memory-mapped ``hdu.data`` is a plain (often writeable) ndarray
+    whose ``.base`` chain ends in an ``mmap.mmap``, so the whole chain is checked.
+    """
+
+    if not arr.flags.writeable:
+        return False
+    base = arr
+    while base is not None:
+        if isinstance(base, (np.memmap, mmap.mmap)):
+            return False
+        base = getattr(base, "base", None)
+    return True
+
+
+def _finish_fits_preview(arr, bayer):
+    if arr.ndim == 2 and bayer:
+        rgb = _debayer_preview_2x2(arr, str(bayer))
+        if rgb is not None:
+            arr = rgb
+    return _normalize_image_array(arr)
+
+
+_FITS_BITPIX_DTYPES = {8: ">u1", 16: ">i2", 32: ">i4", 64: ">i8", -32: ">f4", -64: ">f8"}
+
+
+def _load_scaled_fits_memmap(path: str, hdu, max_dim: int = 0):
+    """Preview of a BZERO/BSCALE/BLANK image HDU read through a raw np.memmap, or None.
+
+    Astropy cannot memory-map scaled data, so it would read and scale the
+    whole frame. Here the stored values are decimated first (only the sampled
+    rows are paged in) and BLANK/BSCALE/BZERO are applied to that slice.
+    """
+
+    try:
+        if isinstance(hdu, getattr(_fits_module(), "CompImageHDU", ())):
+            return None  # tile-compressed pixels live in a binary table
+        hdr = hdu.header
+        dtype = _FITS_BITPIX_DTYPES[int(hdr["BITPIX"])]
+        naxis = int(hdr["NAXIS"])
+        shape = tuple(int(hdr[f"NAXIS{i}"]) for i in range(naxis, 0, -1))
+        offset = int(hdu.fileinfo()["datLoc"])
+        bayer = hdr.get("BAYERPAT")
+        raw = np.squeeze(np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape))
+        if raw.ndim not in (2, 3):
+            return None
+        index = None if bayer else _fits_preview_slices(raw.shape, max_dim)
+        if index is not None:
+            raw = raw[index]
+        # Same working precision as astropy: float32 for 8/16-bit data (exact
+        # for uint16 + BZERO), float64 for wider types so they round once.
+        arr = raw.astype(np.float32 if raw.dtype.itemsize <= 2 else np.float64)
+        blank = hdr.get("BLANK")
+        if blank is not None and np.issubdtype(raw.dtype, np.integer):
+            arr[raw == int(blank)] = np.nan
+        del raw
+        bscale = float(hdr.get("BSCALE", 1.0))
+        bzero = float(hdr.get("BZERO", 0.0))
+        if bscale != 1.0:
+            arr *= bscale
+        if bzero != 0.0:
+            arr += bzero
+        return _finish_fits_preview(arr.astype(np.float32, copy=False), bayer)
+    except Exception:
+        _debug_traceback()
+        return None
+
+
+def _load_fits_preview_and_header(path: str, max_dim: int = 0):
+    if np is None:
+        return None, None
+    if _fitsio_module() is not None:
+        loaded = _load_fits_preview_fitsio(path, max_dim)
+        if loaded is not None:
+            return loaded
+    fits = _fits_module()
+    if fits is None:
         return None, None
 
     def _open(_memmap: bool):
@@ -2077,6 +2896,14 @@ def _load_fits_preview_and_header(path: str):
         with _open(True) as hdulist:
             hdu = _pick_first_image_hdu(hdulist)
             if hdu is not None:
+                header_text = _format_header(hdu)
+                # Scaled data (e.g. uint16 stored as int16 + BZERO) is read and
+                # scaled in full by hdu.data even with memmap=True; map the raw
+                # values instead and scale only the sampled pixels.
+                if any(key in hdu.header for key in ("BZERO", "BSCALE", "BLANK")):
+                    arr = _load_scaled_fits_memmap(path, hdu, max_dim)
+                    if arr is not None:
+                        return arr, header_text
                 try:
                     data = getattr(hdu, "data", None)
                 except ValueError as e:
@@ -2085,7 +2912,6 @@ def _load_fits_preview_and_header(path: str):
                         data = None
                     else:
                         raise
-                header_text = _format_header(hdu)
 
         # Fallback memmap=False if memmap=True failed to load the data
         if data is None:
@@ -2099,23 +2925,30 @@ def _load_fits_preview_and_header(path: str):
                 if header_text is None:
                     header_text = _format_header(hdu)
 
-        arr = np.array(data, dtype=np.float32, copy=True)
-        arr = np.squeeze(arr)
-
+        # In-memory native float32 data (e.g. scaled BZERO/BSCALE HDUs) is
+        # used as is; anything backed by the file mapping is copied, so no
+        # view keeps the file open and the later in-place steps (debayer,
+        # white balance) never write through to the mapping.
         try:
             bayer = hdu.header.get("BAYERPAT")
         except Exception:
             bayer = None
-        if arr.ndim == 2 and bayer:
-            rgb = _debayer_preview_2x2(arr, str(bayer))
-            if rgb is not None:
-                arr = rgb
+        arr = np.squeeze(np.asarray(data))
+        # Decimate before converting: on a memmap only the sampled rows are
+        # read. Bayer mosaics are binned at full resolution first.
+        index = None if bayer else _fits_preview_slices(arr.shape, max_dim)
+        if index is not None:
+            arr = arr[index]
+        if arr.dtype == np.float32 and _is_private_array(arr):
+            arr = np.ascontiguousarray(arr)
+        else:
+            arr = arr.astype(np.float32, copy=True)
+        arr = _finish_fits_preview(arr, bayer)
 
     except Exception:
-        if os.environ.get("ZE_VIEWER_DEBUG", "").strip() not in ("", "0", "false", "False"):
-            traceback.print_exc()
+        _debug_traceback()
         return None, header_text
-    return _normalize_image_array(arr), header_text
+    return arr, header_text
 
 
 def _load_fits_array(path: str):
@@ -2123,19 +2956,31 @@ def _load_fits_array(path: str):
     return arr
 
 
-def _load_pil_array(path: str):
+def _load_pil_array(path: str, max_dim: int = 0):
+    """uint8 (H,W) or (H,W,3) pixels; _load_image downsamples and converts to float32."""
+
+    Image = _pil_image_module()
     if Image is None or np is None:
         return None
     try:
         with Image.open(path) as im:
+            mode = "L" if im.mode == "L" else "RGB"
+            longest = max(im.size)
+            if im.format == "JPEG" and max_dim and longest > max_dim:
+                # Let libjpeg decode at 1/2, 1/4 or 1/8 scale. Only a power of
+                # two dividing the preview step is used, so the block mean in
+                # _load_image still lands on the same preview size.
+                step = int(math.ceil(longest / float(max_dim)))
+                scale = next((s for s in (8, 4, 2) if step % s == 0), 1)
+                if scale > 1:
+                    im.draft(mode, (im.size[0] // scale, im.size[1] // scale))
             im.load()
-            if im.mode == "L":
-                arr = np.array(im, dtype=np.float32, copy=True)
-            else:
-                arr = np.array(im.convert("RGB"), dtype=np.float32, copy=True)
+            arr = np.asarray(im if im.mode == mode else im.convert(mode))
     except Exception:
         return None
-    return _normalize_image_array(arr)
+    if arr.ndim not in (2, 3) or (arr.ndim == 3 and arr.shape[2] != 3):
+        return None
+    return arr
 
 
 def _normalize_image_array(arr):
@@ -2143,13 +2988,15 @@ def _normalize_image_array(arr):
         return None
     if arr is None:
         return None
+    # Both loaders hand over arrays they own, so only convert or re-layout
+    # when needed instead of copying unconditionally.
     if arr.ndim == 2:
-        return np.array(arr, dtype=np.float32, copy=True)
+        return np.ascontiguousarray(arr, dtype=np.float32)
     if arr.ndim == 3:
         if arr.shape[0] == 3 and arr.shape[1] != 3:
             arr = np.transpose(arr, (1, 2, 0))
         if arr.shape[2] == 3:
-            return np.array(arr, dtype=np.float32, copy=True)
+            return np.ascontiguousarray(arr, dtype=np.float32)
     return None
 
 
@@ -2194,23 +3041,204 @@ def _compute_gray_world_gains_rgb(arr_rgb, sample_max: int = 200000):
         return None
 
 
-def _build_hist_sample(arr, sample_max: int):
+class _ScratchPool(threading.local):
+    """Per-thread scratch arrays for the loader's temporaries, keyed by (shape, dtype).
+
+    Browsing a folder repeats the same preview shape, so the finite mask and
+    the histogram buffers are reused instead of faulting in fresh pages on
+    every load. Pool threads expire when idle, taking their arrays with them.
+    """
+
+    max_entries = 4
+
+    def __init__(self):
+        self.arrays: dict = {}
+
+    def get(self, shape, dtype):
+        key = (tuple(shape), np.dtype(dtype).str)
+        arr = self.arrays.get(key)
+        if arr is None:
+            if len(self.arrays) >= self.max_entries:
+                self.arrays.clear()
+            arr = self.arrays[key] = np.empty(shape, dtype=dtype)
+        return arr
+
+
+_scratch_pool = _ScratchPool()
+
+
+def _finite_values(arr, finite=None):
+    """Flattened finite values of arr.
+
+    ``finite`` is a precomputed np.isfinite(arr) mask, or True when arr is
+    known to hold only finite values; it is computed when omitted.
+    """
+
+    if finite is None:
+        finite = np.isfinite(arr)
+        # Non-finite pixels are rare; skip the compaction copy when there are none.
+        if finite.all():
+            finite = True
+    if finite is True:
+        return arr.reshape(-1)
+    return arr[finite]
+
+
+def _build_hist_sample(arr, sample_max: int, finite=None):
     if np is None or arr is None:
         return None
+    # Stride first, then drop non-finite values: masking and compaction only
+    # touch the sampled elements instead of the whole frame.
     flat = arr.reshape(-1)
-    finite = flat[np.isfinite(flat)]
-    if finite.size == 0:
-        return finite
-    if finite.size > sample_max > 0:
-        step = int(math.ceil(finite.size / float(sample_max)))
-        finite = finite[::step]
-    return finite.astype(np.float32, copy=True)
-
-
-def _compute_stats(sample):
+    step = 1
+    if flat.size > sample_max > 0:
+        step = int(math.ceil(flat.size / float(sample_max)))
+    sample = flat[::step]
+    if finite is None:
+        keep = np.isfinite(sample)
+        if not keep.all():
+            sample = sample[keep]
+    elif finite is not True:
+        sample = sample[finite.reshape(-1)[::step]]
+    return sample.astype(np.float32, copy=True)
+
+
+def _compile_stretch_kernel():
+    """Import numba and define the stretch kernel (warm-up only, under _kernel_lock)."""
+
+    global _stretch_byte, _stretch_rgb32_kernel
+    import numba
+
+    @numba.njit(cache=True, nogil=True, inline="always")
+    def _stretch_byte(v, lo, scale):  # pragma: no cover - compiled
+        v = (v - lo) * scale
+        if v > 255.0:
+            v = 255.0
+        if not (v > 0.0):  # also maps NaN to 0 like the NumPy cast
+            v = 0.0
+        return np.uint32(v)
+
+    @numba.njit(cache=True, nogil=True)
+    def _stretch_rgb32_kernel(src, lo, scale, out):  # pragma: no cover - compiled
+        """Fused subtract/scale/clamp/cast of float32 rows into 0xffRRGGBB pixels.
+
+        ``src`` is (rows, cols) grey or (rows, cols*3) interleaved RGB, ``out`` is
+        (rows, cols) uint32. Same float32 operation order as the NumPy path, so
+        results are identical. Deliberately serial: the parallel threading layers
+        do not coexist reliably with Qt worker threads.
+        """
+
+        rows, cols = out.shape
+        opaque = np.uint32(0xFF000000)
+        if src.shape[1] == cols:
+            for r in range(rows):
+                for c in range(cols):
+                    out[r, c] = opaque | (_stretch_byte(src[r, c], lo, scale) * np.uint32(0x010101))
+        else:
+            for r in range(rows):
+                for c in range(cols):
+                    red = _stretch_byte(src[r, 3 * c], lo, scale)
+                    green = _stretch_byte(src[r, 3 * c + 1], lo, scale)
+                    blue = _stretch_byte(src[r, 3 * c + 2], lo, scale)
+                    out[r, c] = opaque | (red << np.uint32(16)) | (green << np.uint32(8)) | blue
+
+
+_stretch_rgb32_kernel = None
+_kernel_lock = threading.Lock()
+# "ready": numba is installed (imported only by _warm_stretch_kernel);
+# "compiled": the kernel is built and frozen, so stretches may call it.
+_kernel_state = {"ready": importlib.util.find_spec("numba") is not None, "compiled": False}
+
+
+def _warm_stretch_kernel():
+    """Import numba and compile the stretch kernel once, on the GUI thread.
+
+    The viewer schedules this from an idle timer after the first preview
+    has been shown, so neither the load nor the first stretch waits on it;
+    stretches use the NumPy path until it is done. JIT work off the main
+    thread is what crashed before, so other threads never compile, and
+    disable_compile() freezes the kernel for the stretch worker.
+    """
+
+    if not _kernel_state["ready"] or _kernel_state["compiled"]:
+        return
+    if threading.current_thread() is not threading.main_thread():
+        return
+    with _kernel_lock:
+        if _kernel_state["compiled"] or not _kernel_state["ready"]:
+            return
+        try:
+            _compile_stretch_kernel()
+            # Same array types as _stretch_to_rgb32 passes: C-contiguous 2-D rows.
+            _stretch_rgb32_kernel(
+                np.zeros((1, 3), dtype=np.float32), np.float32(0.0), np.float32(1.0), np.zeros((1, 1), dtype=np.uint32)
+            )
+            _stretch_rgb32_kernel.disable_compile()
+            _kernel_state["compiled"] = True
+        except Exception:
+            _kernel_state["ready"] = False
+
+
+def _new_rgb32_buffer(h: int, w: int):
+    """(h, w, 4) uint8 display buffer with the constant 0xff byte already set."""
+
+    buf = np.empty((h, w, 4), dtype=np.uint8)
+    buf[:, :, _RGB32_X] = 255
+    return buf
+
+
+def _stretch_to_rgb32(arr, lo: float, hi: float, out=None, scratch=None):
+    """Map arr linearly from [lo, hi] into an RGB32 display buffer (H, W, 4).
+
+    Grey images are replicated into the three colour bytes. ``out`` (from
+    _new_rgb32_buffer) and ``scratch`` (float, same shape as arr) are reused
+    when given so repeated stretches of the same image do not allocate; only
+    the colour bytes are written. Uses the fused Numba kernel once the
+    viewer has warmed it up (scratch is then not needed).
+    """
+
+    h, w = arr.shape[:2]
+    if out is None or out.shape != (h, w, 4):
+        out = _new_rgb32_buffer(h, w)
+    # Map straight to [0, 255]: one multiply instead of divide-then-*255.
+    scale = 255.0 / (float(hi) - float(lo))
+    if (
+        _kernel_state["compiled"]
+        and arr.dtype == np.float32
+        and (arr.ndim == 2 or (arr.ndim == 3 and arr.shape[2] == 3))
+        and arr.size
+        and arr.flags.c_contiguous
+        and out.flags.c_contiguous
+    ):
+        try:
+            # Flat rows index much faster in the kernel than (h, w, 3).
+            pixels = out.view(np.uint32).reshape(h, w)
+            _stretch_rgb32_kernel(arr.reshape(h, -1), np.float32(lo), np.float32(scale), pixels)
+            return out
+        except Exception:
+            pass
+    if scratch is None or scratch.shape != arr.shape:
+        scratch = np.empty(arr.shape, dtype=np.result_type(arr.dtype, np.float32))
+    np.subtract(arr, lo, out=scratch)
+    np.multiply(scratch, scale, out=scratch)
+    np.clip(scratch, 0.0, 255.0, out=scratch)
+    if scratch.ndim == 2:
+        # Whole pixels at once: 0xff000000 | v * 0x010101 (via uint8 so NaN -> 0).
+        pixels = out.view(np.uint32).reshape(h, w)
+        np.multiply(scratch.astype(np.uint8), np.uint32(0x010101), out=pixels)
+        np.bitwise_or(pixels, np.uint32(0xFF000000), out=pixels)
+    else:
+        # Per-channel copies beat one copy through the reversed byte view.
+        rgb = out[:, :, _RGB32_RGB]
+        for k in range(3):
+            np.copyto(rgb[:, :, k], scratch[:, :, k], casting="unsafe")
+    return out
+
+
+def _compute_stats(sample, finite=None):
     if np is None or sample is None or getattr(sample, "size", 0) == 0:
         return None
-    finite = sample[np.isfinite(sample)]
+    finite = _finite_values(sample, finite)
     if finite.size == 0:
         return None
     return {
@@ -2221,38 +3249,123 @@ def _compute_stats(sample):
     }
 
 
-def _compute_auto_levels(sample):
+def _compute_auto_levels(sample, finite=None):
     if np is None or sample is None or getattr(sample, "size", 0) == 0:
         return (None, None)
-    finite = sample[np.isfinite(sample)]
+    finite = _finite_values(sample, finite)
     if finite.size == 0:
         return (None, None)
     try:
-        lo, hi = np.percentile(finite, [0.5, 99.5])
+        lo, hi = _percentiles_by_partition(finite, (0.5, 99.5))
         return float(lo), float(hi)
     except Exception:
         return (None, None)
 
 
-def _compute_histogram(arr, bins: int):
+def _percentiles_by_partition(values, qs):
+    """np.percentile(values, qs) (linear method) from single-kth np.partition calls.
+
+    Only the two neighbours of each virtual index are needed, so partitioning
+    around them is O(N); the interpolation mirrors NumPy's own lerp, so the
+    result is identical without np.percentile's generic quantile machinery.
+    """
+
+    n = values.size
+    pos = np.asarray(qs, dtype=np.float64) / 100.0 * (n - 1)
+    below = np.floor(pos).astype(np.intp)
+    a = np.empty(below.size, dtype=values.dtype)
+    b = np.empty(below.size, dtype=values.dtype)
+    # One scalar kth per quantile: NumPy selects a single kth with a SIMD
+    # kernel but falls back to introselect for a kth array (~10x slower).
+    # The upper neighbour is then just the smallest value past the pivot.
+    for i, k in enumerate(below.tolist()):
+        part = np.partition(values, k)
+        a[i] = part[k]
+        b[i] = part[k + 1:].min() if k + 1 < n else part[k]
+    t = pos - below
+    diff = np.subtract(b, a)
+    out = np.add(a, diff * t)
+    np.subtract(b, diff * (1 - t), out=out, where=t >= 0.5)
+    return out
+
+
+def _uniform_histogram(values, bins: int, value_range=None, scratch=None):
+    """Equivalent of np.histogram(values, bins, value_range) for finite values.
+
+    Bins are uniform over [min, max] (or ``value_range``, which must contain
+    the values), so the bin index is a single scale of the value and the
+    counts come from one np.bincount; np.histogram adds blockwise edge
+    corrections on top of that. Only values sitting exactly on an inner edge
+    may land in the neighbouring bin.
+
+    ``values`` may be any shape, e.g. a strided channel view. ``scratch`` is
+    an optional (float, intp) pair of buffers shaped like ``values`` so the
+    per-channel calls reuse them instead of faulting in fresh arrays.
+    """
+
+    lo, hi = (values.min(), values.max()) if value_range is None else value_range
+    lo, hi, dtype, scale, edges = _uniform_bins(lo, hi, values.dtype, bins)
+    if scratch is not None and scratch[0].dtype == dtype:
+        scaled, index = scratch
+        np.subtract(values, lo, out=scaled)
+    else:
+        scaled = np.subtract(values, lo, dtype=dtype)
+        index = np.empty(values.shape, dtype=np.intp)
+    # Scale and truncate to bin indices in one pass.
+    np.multiply(scaled, scale, out=index, casting="unsafe")
+    # Values in [lo, hi] map to [0, bins]; the max lands in the extra bin and
+    # is folded back into the last one (np.histogram's closed last bin).
+    counts = np.bincount(index.reshape(-1), minlength=bins + 1)
+    counts[bins - 1] += counts[bins:].sum()
+    return counts[:bins], edges
+
+
+def _uniform_bins(lo, hi, values_dtype, bins: int):
+    """Shared edge setup for the uniform histograms: (lo, hi, dtype, scale, edges)."""
+
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    dtype = np.result_type(lo, hi, values_dtype)
+    if not np.issubdtype(dtype, np.floating):
+        dtype = np.result_type(dtype, float)
+    edges = np.linspace(lo, hi, bins + 1, dtype=dtype)
+    return lo, hi, dtype, dtype.type(bins / (float(hi) - float(lo))), edges
+
+
+def _compute_histogram(arr, bins: int, finite=None):
     if np is None or arr is None:
         return None
     try:
         if arr.ndim == 2:
-            finite = arr[np.isfinite(arr)]
-            counts, edges = np.histogram(finite, bins=bins) if finite.size else (np.zeros(bins, dtype=int), np.linspace(0, 1, bins + 1))
+            values = _finite_values(arr, finite)
+            counts, edges = _uniform_histogram(values, bins) if values.size else (np.zeros(bins, dtype=int), np.linspace(0, 1, bins + 1))
             return {"counts": counts, "edges": edges, "channels": 1}
         if arr.ndim == 3:
+            scratch = None
+            if finite is True:
+                # All-finite channels are binned straight from their strided
+                # views through one shared pair of scratch buffers.
+                channels = [arr[:, :, i] for i in range(arr.shape[2])]
+                scratch = (_scratch_pool.get(arr.shape[:2], arr.dtype), _scratch_pool.get(arr.shape[:2], np.intp))
+            else:
+                channels = [
+                    _finite_values(arr[:, :, i], finite if finite is None else finite[:, :, i])
+                    for i in range(arr.shape[2])
+                ]
+            present = [values for values in channels if values.size]
+            edges = np.linspace(0, 1, bins + 1)
+            value_range = None
+            # One set of edges for all channels so the curves share the x axis.
+            if scratch is not None and arr.size:
+                value_range = (arr.min(), arr.max())
+            elif present:
+                value_range = (min(v.min() for v in present), max(v.max() for v in present))
             counts_list = []
-            edges = None
-            for i in range(arr.shape[2]):
-                channel = arr[:, :, i]
-                finite = channel[np.isfinite(channel)]
-                if finite.size:
-                    counts, edges = np.histogram(finite, bins=bins)
+            for values in channels:
+                if values.size:
+                    counts, edges = _uniform_histogram(values, bins, value_range, scratch)
                 else:
                     counts = np.zeros(bins, dtype=int)
-                    edges = edges or np.linspace(0, 1, bins + 1)
                 counts_list.append(counts)
             return {"counts": np.stack(counts_list, axis=0), "edges": edges, "channels": len(counts_list)}
     except Exception:
@@ -2261,38 +3374,53 @@ def _compute_histogram(arr, bins: int):
 
 
 def _stable_sorted_files(dir_path: str) -> list[str]:
-    files: list[str] = []
+    entries: list[tuple[str, str, str]] = []
     try:
         with os.scandir(dir_path) as it:
             for entry in it:
-                if entry.is_file() and entry.name.lower().endswith(SUPPORTED_EXTS):
-                    files.append(entry.path)
+                name = entry.name
+                # Cheap extension test first so non-images never reach is_file().
+                if name.lower().endswith(SUPPORTED_EXTS) and entry.is_file():
+                    entries.append((name.casefold(), name, entry.path))
     except Exception:
         return []
-    files.sort(key=lambda p: (os.path.basename(p).casefold(), os.path.basename(p)))
-    return files
+    # Sort keys are built once per entry from the scandir name.
+    entries.sort()
+    return [path for _folded, _name, path in entries]
 
 
 def _index_directory(dir_path: str, current_path: str) -> dict:
     files = _stable_sorted_files(dir_path)
-    norm_current = os.path.normcase(os.path.realpath(current_path))
-    idx = -1
-    for i, p in enumerate(files):
-        if os.path.normcase(os.path.realpath(p)) == norm_current:
-            idx = i
-            break
+    # Scanned paths are dir_path joined with the entry name, so the current
+    # file normally matches verbatim; resolving every entry is the fallback.
+    try:
+        idx = files.index(current_path)
+    except ValueError:
+        norm_current = _norm_path(current_path)
+        idx = -1
+        for i, p in enumerate(files):
+            if _norm_path(p) == norm_current:
+                idx = i
+                break
     return {
         "dir_path": dir_path,
         "dir_files": files,
         "dir_index": idx,
-        "dir_cache_key": _build_dir_cache_key(dir_path, files),
+        "dir_cache_key": _build_dir_cache_key(dir_path, len(files)),
     }
 
 
-def _build_dir_cache_key(dir_path: str, files: Iterable[str]):
+def _dir_identity(dir_path: str, st):
+    """(st_dev, st_ino) from an existing stat; normalized path where inodes are 0."""
+
+    if getattr(st, "st_ino", 0):
+        return (st.st_dev, st.st_ino)
+    return _norm_path(dir_path)
+
+
+def _build_dir_cache_key(dir_path: str, file_count: int):
     try:
-        stat = os.stat(dir_path)
-        dir_real = os.path.normcase(os.path.realpath(dir_path))
-        return (dir_real, getattr(stat, "st_mtime", 0.0), len(list(files)))
+        st = os.stat(dir_path)
+        return (_dir_identity(dir_path, st), getattr(st, "st_mtime", 0.0), int(file_count))
     except Exception:
         return None